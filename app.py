@@ -1,7 +1,16 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import csv
+import gzip
+import hashlib
+import io
+import json
 import os
 import random
-from typing import Any, Optional, Dict
+import zlib
+from pathlib import Path
+from typing import Any, Optional, Dict, Iterable, Iterator, List, Tuple
+
+import click
 from flask import (
     Flask,
     Response,
@@ -12,16 +21,26 @@ from flask import (
     render_template,
     request,
     session,
+    stream_template,
+    stream_with_context,
     url_for,
 )
+from werkzeug.http import is_resource_modified
+from werkzeug.utils import secure_filename
 
+from jobs import JobContext, get_job, submit_job
 from log_generator import generate_logs
 from storage import (
+    checkpoint_dataset,
     close_db,
+    compact_dataset,
     consume_login_token,
     create_dataset,
     delete_dataset,
+    ensure_db_initialized,
+    export_boot_events,
     get_boot_details,
+    get_boot_histogram,
     get_boot_meta,
     get_dataset,
     get_dataset_by_name,
@@ -30,16 +49,23 @@ from storage import (
     get_user,
     get_first_dataset,
     init_db,
+    list_all_datasets,
+    list_catalog_boots,
     insert_events_into_dataset,
     issue_login_token,
+    iter_events_from_upload,
     list_bookmarks_for_user,
+    list_boot_events,
+    list_boot_events_in_window,
     list_comments_for_boot,
     list_boots_for_dataset,
     list_datasets,
     load_log_data_from_dataset,
-    parse_events_from_upload,
+    rebuild_dataset_registry,
+    search_boot_events,
     create_comment,
     set_bookmark,
+    stage_upload,
     update_boot_metadata,
     update_user_last_seen,
     update_user_name,
@@ -54,6 +80,26 @@ app.config["DATABASE"] = os.environ.get(
 app.config["DATASET_ROOT"] = os.environ.get(
     "LOG_VIEWER_DATASETS", os.path.join(app.root_path, "data", "datasets")
 )
+# SQLite concurrency settings; see docs/concurrency.rst.
+app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(os.environ.get("LOG_VIEWER_BUSY_TIMEOUT_MS", "5000"))
+app.config["SQLITE_WAL_AUTOCHECKPOINT"] = int(os.environ.get("LOG_VIEWER_WAL_AUTOCHECKPOINT", "1000"))
+# Background worker threads for uploads and generated boots.
+app.config["INGEST_WORKERS"] = int(os.environ.get("LOG_VIEWER_INGEST_WORKERS", "2"))
+# Events inlined into the viewer page; the rest are paged in via the events API.
+app.config["BOOT_INITIAL_EVENTS"] = int(os.environ.get("LOG_VIEWER_BOOT_INITIAL_EVENTS", "2000"))
+app.config["EVENTS_PAGE_MAX"] = 10000
+# Memory budget for decoded boots kept in process; 0 disables the cache.
+app.config["BOOT_CACHE_BYTES"] = int(os.environ.get("LOG_VIEWER_BOOT_CACHE_MB", "256")) * 1024 * 1024
+# Store event data payloads deflated with a per-dataset preset dictionary.
+app.config["DATA_COMPRESSION"] = os.environ.get("LOG_VIEWER_DATA_COMPRESSION", "1") != "0"
+# gzip responses for clients that accept it: bodies under COMPRESS_MIN_BYTES are
+# sent as-is (streamed bodies are always compressed); level 0 turns it off.
+app.config["COMPRESS_LEVEL"] = int(os.environ.get("LOG_VIEWER_COMPRESS_LEVEL", "6"))
+app.config["COMPRESS_MIN_BYTES"] = int(os.environ.get("LOG_VIEWER_COMPRESS_MIN_BYTES", "1024"))
+# Upper bound on buckets returned by the histogram API.
+app.config["HISTOGRAM_MAX_BUCKETS"] = 2000
+# Full-text search index in new dataset files; speeds up term searches at some ingest cost.
+app.config["SEARCH_FTS"] = os.environ.get("LOG_VIEWER_SEARCH_FTS", "1") != "0"
 
 
 def login_user(user_id: int) -> None:
@@ -70,14 +116,101 @@ def teardown_db(error: Optional[BaseException] = None) -> None:
     close_db(error)
 
 
+_COMPRESSIBLE_MIMETYPES = {"application/json", "application/javascript", "application/x-ndjson", "image/svg+xml"}
+
+
+def _gzip_chunks(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.after_request
+def compress_response(response: Response) -> Response:
+    """gzip the body when the client accepts it, chunk by chunk for streamed bodies."""
+    level = app.config["COMPRESS_LEVEL"]
+    mimetype = response.mimetype or ""
+    if (
+        level <= 0
+        or request.method == "HEAD"
+        or response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not (mimetype.startswith("text/") or mimetype.endswith("+json") or mimetype in _COMPRESSIBLE_MIMETYPES)
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    if request.accept_encodings["gzip"] <= 0:
+        return response
+    if response.is_streamed:
+        response.response = _gzip_chunks(response.iter_encoded(), level)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < app.config["COMPRESS_MIN_BYTES"]:
+            return response
+        response.set_data(gzip.compress(data, level))
+    response.headers["Content-Encoding"] = "gzip"
+    # A gzipped body is another representation of the same resource: weaken
+    # the ETag (If-None-Match compares weakly, so revalidation still matches).
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
 @app.context_processor
 def inject_user() -> Dict[str, Any]:
     return {"current_user": getattr(g, "current_user", None)}
 
 
+def bootstrap() -> None:
+    """Create/migrate the app DB once at startup, outside request handling."""
+    with app.app_context():
+        init_db()
+
+
+@app.cli.command("init-db")
+def init_db_command() -> None:
+    init_db()
+    click.echo(f"Initialized {app.config['DATABASE']}")
+
+
+@app.cli.command("rebuild-registry")
+def rebuild_registry_command() -> None:
+    ensure_db_initialized()
+    count = rebuild_dataset_registry()
+    click.echo(f"Registered {count} datasets from {app.config['DATASET_ROOT']}")
+
+
+@app.cli.command("checkpoint")
+def checkpoint_command() -> None:
+    """Truncate every dataset WAL file (run during quiet periods)."""
+    ensure_db_initialized()
+    for dataset in list_all_datasets():
+        busy, frames, done = checkpoint_dataset(dataset, "TRUNCATE")
+        status = "busy" if busy else "ok"
+        click.echo(f"{dataset['name']} ({dataset['id']}): {done}/{frames} frames {status}")
+
+
+@app.cli.command("compact-datasets")
+@click.argument("dataset_id", type=int, required=False)
+def compact_datasets_command(dataset_id: Optional[int]) -> None:
+    """Recompress data payloads and VACUUM datasets (run during quiet periods)."""
+    ensure_db_initialized()
+    for dataset in list_all_datasets():
+        if dataset_id is not None and dataset["id"] != dataset_id:
+            continue
+        before, after = compact_dataset(dataset)
+        click.echo(f"{dataset['name']} ({dataset['id']}): {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+
 @app.before_request
 def load_user() -> None:
-    init_db()
+    ensure_db_initialized()
     g.current_user = None
     user_id = session.get("user_id")
     last_seen_str = session.get("last_seen")
@@ -114,6 +247,53 @@ def _require_login_redirect():
     return redirect(url_for("login"))
 
 
+def _code_fingerprint() -> str:
+    """Digest of the app's code and templates, so a deploy changes every ETag."""
+    digest = hashlib.blake2b(digest_size=8)
+    root = Path(app.root_path)
+    for path in sorted([*root.glob("*.py"), *(root / "templates").rglob("*")]):
+        if path.is_file():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+CODE_FINGERPRINT = _code_fingerprint()
+
+
+def _etag(*parts: Any) -> str:
+    """Strong ETag for a response fully determined by ``parts`` (and the code)."""
+    key = json.dumps([CODE_FINGERPRINT, *parts], sort_keys=True, default=str)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Per-user content: browsers may keep it, but must revalidate before reuse.
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _dataset_last_modified(dataset: Dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(dataset["updated_at"]).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """A 304 response if the request's validators still match, else None."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _set_validators(Response(status=304), etag, last_modified)
+
+
+def _conditional_json(payload: Dict[str, Any]) -> Response:
+    """JSON response validated by a hash of its body; for small, cheap-to-build payloads."""
+    response = jsonify(payload)
+    response.add_etag()
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if g.current_user:
@@ -180,12 +360,37 @@ def index():
 
     boot_id = request.args.get("boot")
     log_data = None
+    etag = None
+    datasets = list_datasets(current_user_id)
     if dataset:
         if not boot_id:
             latest_boot = get_latest_boot_id_for_dataset(dataset["id"])
             if latest_boot:
                 return redirect(url_for("index", dataset=dataset["id"], boot=latest_boot))
-        log_data = load_log_data_from_dataset(dataset, boot_id)
+        # Everything the page shows follows from these, so a reload can skip loading the boot.
+        # Pending flash messages have to be rendered, so those pages are never revalidated.
+        if "_flashes" not in session:
+            user = g.current_user
+            etag = _etag(
+                "index",
+                [user["id"], user.get("name"), user.get("email")] if user else None,
+                dataset["id"],
+                dataset["generation"],
+                boot_id,
+                datasets,
+                app.config["BOOT_INITIAL_EVENTS"],
+            )
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+        log_data = load_log_data_from_dataset(dataset, boot_id, limit=app.config["BOOT_INITIAL_EVENTS"])
+        if log_data:
+            log_data["events_url"] = url_for(
+                "boot_events_api", dataset_id=dataset["id"], boot_id=log_data["boot_id"]
+            )
+            log_data["histogram_url"] = url_for(
+                "boot_histogram_api", dataset_id=dataset["id"], boot_id=log_data["boot_id"]
+            )
         if boot_id and not log_data:
             latest_boot = get_latest_boot_id_for_dataset(dataset["id"])
             if latest_boot:
@@ -202,21 +407,32 @@ def index():
         log_data = generate_logs(hours_value, seed)
         dataset = None
 
-    datasets = list_datasets(current_user_id)
     boots_for_dataset = list_boots_for_dataset(dataset["id"]) if dataset else []
 
-    return render_template(
-        "index.html",
-        log_data=log_data,
-        current_dataset=dataset,
-        datasets=datasets,
-        boots=boots_for_dataset,
+    # Stream the page as it renders. Flash messages are popped while rendering,
+    # after the session cookie has gone out, so pages showing them are built first.
+    render = render_template if "_flashes" in session else stream_template
+    response = Response(
+        render(
+            "index.html",
+            log_data=log_data,
+            current_dataset=dataset,
+            datasets=datasets,
+            boots=boots_for_dataset,
+        ),
+        mimetype="text/html",
     )
+    if dataset and etag:
+        _set_validators(response, etag)
+    return response
 
 
 @app.route("/app.js")
 def app_js():
-    return Response(render_template("app.js"), mimetype="application/javascript")
+    response = Response(render_template("app.js"), mimetype="application/javascript")
+    response.add_etag()
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
 
 
 @app.route("/upload", methods=["GET", "POST"])
@@ -250,58 +466,29 @@ def upload_logs():
             flash("Select an existing dataset or provide a new dataset name.")
             return redirect(url_for("upload_logs"))
 
-        events = []
-        created_boot_ids = []
         if file and file.filename:
-            events = parse_events_from_upload(file)
-            if not events:
-                flash("No events found in upload. Ensure JSON is an array or has an 'events' list.")
-                return redirect(url_for("upload_logs"))
-            for ev in events:
-                ev.setdefault("event_id", ev.get("name") or ev.get("id") or "")
-                ev.setdefault("tags", [])
-            created_boot_ids.append(insert_events_into_dataset(dataset_obj, events, mode="production"))
+            staged_path = stage_upload(file)
+            job_id = submit_job(
+                "upload",
+                dataset_obj["id"],
+                current_user_id,
+                lambda job: _ingest_upload_job(job, dataset_obj, staged_path),
+            )
         else:
             try:
                 hours_value = max(0.25, min(48.0, float(gen_hours))) if gen_hours else 4.0
             except (TypeError, ValueError):
                 hours_value = 4.0
-            rng = random.Random(gen_seed if gen_seed else datetime.utcnow().isoformat())
-            boot_count = rng.randint(1, 5)
-            # Keep a small pool so multiple boots share event names.
-            target_pool_size = rng.randint(1, min(3, boot_count))
-            event_name_pool = []
-            total_events = 0
-            for idx in range(boot_count):
-                seed_suffix = f"{gen_seed or 'auto'}-boot-{idx + 1}-{rng.randint(0, 999999)}"
-                generated = generate_logs(hours_value, seed_suffix)
-                events = generated.get("events", [])
-                candidate_name = next(
-                    (
-                        (ev.get("name") or ev.get("id") or "").strip()
-                        for ev in events
-                        if (ev.get("name") or ev.get("id"))
-                    ),
-                    "Generated Event",
-                )
-                if len(event_name_pool) < target_pool_size and candidate_name not in event_name_pool:
-                    event_name_pool.append(candidate_name)
-                if not event_name_pool:
-                    event_name_pool.append(candidate_name)
-                boot_event_name = rng.choice(event_name_pool)
-                for ev in events:
-                    ev["event_id"] = boot_event_name
-                    ev.setdefault("tags", [])
-                mode = rng.choice(["production", "test"])
-                created_boot_ids.append(insert_events_into_dataset(dataset_obj, events, mode=mode))
-                total_events += len(events)
-            flash(
-                f"Generated {boot_count} boots ({total_events} events total) into dataset '{dataset_obj['name']}'."
+            job_id = submit_job(
+                "generate",
+                dataset_obj["id"],
+                current_user_id,
+                lambda job: _generate_boots_job(job, dataset_obj, hours_value, gen_seed),
             )
-            return redirect(url_for("index", dataset=dataset_obj["id"], boot=created_boot_ids[0]))
 
-        flash(f"Imported {len(events)} events into dataset '{dataset_obj['name']}'.")
-        return redirect(url_for("index", dataset=dataset_obj["id"], boot=created_boot_ids[0]))
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify({"job_id": job_id, "status_url": url_for("job_status_api", job_id=job_id)}), 202
+        return redirect(url_for("upload_logs", job=job_id))
 
     latest_boot_map = {}
     for dataset in datasets:
@@ -312,89 +499,121 @@ def upload_logs():
         selected_dataset_id=selected_dataset_id,
         current_user_id=current_user_id,
         latest_boot_map=latest_boot_map,
+        job_id=request.args.get("job"),
+    )
+
+
+def _ingest_upload_job(job: JobContext, dataset: Dict[str, Any], staged_path: Path) -> None:
+    stats: Dict[str, Any] = {}
+    # Malformed input raises ValueError with its own message, which the job reports.
+    try:
+        with open(staged_path, "rb") as fh:
+            boot_id = insert_events_into_dataset(
+                dataset, iter_events_from_upload(fh), mode="production", stats=stats, progress=job.progress
+            )
+    finally:
+        staged_path.unlink(missing_ok=True)
+    if not boot_id:
+        raise ValueError("No events found in upload. Ensure JSON is an array, has an 'events' list, or is NDJSON.")
+    job.add_boot(boot_id, stats["events"])
+    job.set_message(
+        f"Imported {stats['events']} events into dataset '{dataset['name']}' "
+        f"({stats['events_per_second']:.0f} events/s)."
     )
 
 
+def _generate_boots_job(job: JobContext, dataset: Dict[str, Any], hours_value: float, gen_seed: Optional[str]) -> None:
+    rng = random.Random(gen_seed if gen_seed else datetime.utcnow().isoformat())
+    boot_count = rng.randint(1, 5)
+    # Keep a small pool so multiple boots share event names.
+    target_pool_size = rng.randint(1, min(3, boot_count))
+    event_name_pool = []
+    total_events = 0
+    for idx in range(boot_count):
+        seed_suffix = f"{gen_seed or 'auto'}-boot-{idx + 1}-{rng.randint(0, 999999)}"
+        generated = generate_logs(hours_value, seed_suffix)
+        events = generated.get("events", [])
+        candidate_name = next(
+            (
+                (ev.get("name") or ev.get("id") or "").strip()
+                for ev in events
+                if (ev.get("name") or ev.get("id"))
+            ),
+            "Generated Event",
+        )
+        if len(event_name_pool) < target_pool_size and candidate_name not in event_name_pool:
+            event_name_pool.append(candidate_name)
+        if not event_name_pool:
+            event_name_pool.append(candidate_name)
+        boot_event_name = rng.choice(event_name_pool)
+        for ev in events:
+            ev["event_id"] = boot_event_name
+            ev.setdefault("tags", [])
+        mode = rng.choice(["production", "test"])
+        job.add_boot(
+            insert_events_into_dataset(dataset, events, mode=mode, progress=job.progress), len(events)
+        )
+        total_events += len(events)
+    job.set_message(f"Generated {boot_count} boots ({total_events} events total) into dataset '{dataset['name']}'.")
+
+
+@app.route("/api/jobs/<job_id>")
+def job_status_api(job_id: str):
+    job = get_job(job_id)
+    current_user_id = g.current_user["id"] if g.current_user else None
+    if not job or job["user_id"] != current_user_id:
+        return jsonify({"error": "not_found"}), 404
+    if job["state"] == "done" and job["boot_ids"]:
+        job["view_url"] = url_for("index", dataset=job["dataset_id"], boot=job["boot_ids"][0])
+    return jsonify({"job": job})
+
+
 @app.route("/logs")
 def logs_index():
     current_user_id = g.current_user["id"] if g.current_user else None
     datasets = list_datasets(current_user_id)
+    show_all = request.args.get("dataset_id") == "all"
     dataset_id = request.args.get("dataset_id", type=int)
     filter_system = (request.args.get("system") or "").strip()
+    filter_tag = (request.args.get("tag") or "").strip()
     filter_mode = (request.args.get("mode") or "").strip().lower()
     if filter_mode not in {"production", "test"}:
         filter_mode = ""
     all_datasets = datasets
-    selected_dataset_id = dataset_id or (all_datasets[0]["id"] if all_datasets else None)
-    selected_dataset = next((d for d in all_datasets if d["id"] == selected_dataset_id), None)
-
-    boots = []
-    for dataset in ([selected_dataset] if selected_dataset else []):
-        for boot in list_boots_for_dataset(dataset["id"]):
-            boots.append(
-                {
-                    "boot_id": boot["boot_id"],
-                    "event_count": boot["event_count"],
-                    "created_at": boot["created_at"],
-                    "dataset_id": dataset["id"],
-                    "dataset_name": dataset["name"],
-                    "mode": boot.get("mode", "production"),
-                }
-            )
-    boots.sort(key=lambda b: b["created_at"], reverse=True)
-    boots.sort(key=lambda b: b["dataset_name"].lower())
+    if show_all:
+        selected_dataset_id = "all"
+    else:
+        selected_dataset_id = dataset_id or (all_datasets[0]["id"] if all_datasets else None)
+        if not any(d["id"] == selected_dataset_id for d in all_datasets):
+            selected_dataset_id = None
 
-    boot_meta_map = {}
-    for boot in boots:
-        dataset = get_dataset(boot["dataset_id"])
-        details = get_boot_details(dataset, boot["boot_id"]) if dataset else {}
-        meta_key = f"{boot['dataset_id']}:{boot['boot_id']}"
-        boot["meta_key"] = meta_key
-        boot_meta_map[meta_key] = {
-            "system": details.get("system", "") if details else "",
-            "event_id": details.get("event_id", "") if details else "",
-            "tags": details.get("tags", "") if details else "",
-            "mode": details.get("mode", boot.get("mode", "production")) if details else boot.get("mode", "production"),
-        }
-
-    system_options = sorted(
-        {((meta.get("system") or "").strip()) for meta in boot_meta_map.values() if (meta.get("system") or "").strip()},
-        key=str.lower,
+    summaries = (
+        list_catalog_boots(
+            current_user_id,
+            dataset_id=None if show_all else selected_dataset_id,
+            system=filter_system or None,
+            mode=filter_mode or None,
+            tag=filter_tag or None,
+        )
+        if selected_dataset_id
+        else {"boots": [], "systems": [], "tags": []}
     )
-
     filtered_boots = []
-    for boot in boots:
-        meta = boot_meta_map.get(boot["meta_key"], {})
-        event_name_val = (meta.get("event_id") or "Uncategorized").strip() or "Uncategorized"
-        system_val = (meta.get("system") or "").strip()
-        mode_val = (meta.get("mode") or boot.get("mode") or "production").strip().lower()
-        if filter_system and system_val != filter_system:
-            continue
-        if filter_mode and mode_val != filter_mode:
-            continue
-        filtered_boots.append(boot)
-
+    boot_meta_map = {}
     grouped_boots = []
-    grouped_map: Dict[str, Dict[str, Any]] = {}
-    for boot in filtered_boots:
-        meta = boot_meta_map.get(boot["meta_key"], {})
-        event_name = (meta.get("event_id") or "Uncategorized").strip() or "Uncategorized"
-        if event_name not in grouped_map:
-            grouped_map[event_name] = {"event_name": event_name, "boots": []}
-        grouped_map[event_name]["boots"].append(boot)
-    for event_name in sorted(grouped_map.keys(), key=str.lower):
-        group = grouped_map[event_name]
-        group["boots"].sort(key=lambda b: b["created_at"], reverse=True)
-        prod_boot = next(
-            (
-                b
-                for b in group["boots"]
-                if (boot_meta_map.get(b["meta_key"], {}).get("mode") or b.get("mode")) == "production"
-            ),
-            None,
-        )
-        group["latest_production_boot"] = prod_boot
-        grouped_boots.append(group)
+    for boot in summaries["boots"]:
+        meta_key = f"{boot['dataset_id']}:{boot['boot_id']}"
+        boot = dict(boot, meta_key=meta_key)
+        boot_meta_map[meta_key] = {key: boot[key] for key in ("system", "event_id", "tags", "mode")}
+        filtered_boots.append(boot)
+        # Rows arrive grouped by event name, newest first within a group.
+        if not grouped_boots or grouped_boots[-1]["event_name"] != boot["event_name"]:
+            grouped_boots.append({"event_name": boot["event_name"], "boots": [], "latest_production_boot": None})
+        group = grouped_boots[-1]
+        group["boots"].append(boot)
+        if group["latest_production_boot"] is None and boot["mode"] == "production":
+            group["latest_production_boot"] = boot
+    system_options = summaries["systems"]
 
     return render_template(
         "logs.html",
@@ -406,6 +625,9 @@ def logs_index():
         filter_system=filter_system,
         filter_mode=filter_mode,
         system_options=system_options,
+        filter_tag=filter_tag,
+        tag_options=summaries["tags"],
+        show_all=show_all,
     )
 
 
@@ -464,6 +686,300 @@ def edit_boot(dataset_id: int, boot_id: str):
     )
 
 
+COLUMNAR_MIMETYPE = "application/vnd.logviewer.columnar+json"
+
+
+def _columnar_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Events as one array per field, with strings replaced by indexes into
+    a shared table. Decoded by LogApp.decodeColumnarEvents (log_view.js).
+
+    ``encodings`` says how each column is stored: ``string`` (string table
+    index or null), ``string_list`` (list of indexes or null) or ``value``
+    (the values as-is).
+    """
+    fields: Dict[str, None] = {}
+    for event in events:
+        fields.update(dict.fromkeys(event))
+    strings: List[str] = []
+    string_index: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    columns: Dict[str, List[Any]] = {}
+    encodings: Dict[str, str] = {}
+    for field in fields:
+        values = [event.get(field) for event in events]
+        present = [value for value in values if value is not None]
+        if all(value.__class__ is str for value in present):
+            encodings[field] = "string"
+            columns[field] = [None if value is None else intern(value) for value in values]
+        elif all(
+            value.__class__ is list and all(item.__class__ is str for item in value) for value in present
+        ):
+            encodings[field] = "string_list"
+            columns[field] = [None if value is None else [intern(item) for item in value] for value in values]
+        else:
+            encodings[field] = "value"
+            columns[field] = values
+    return {"count": len(events), "strings": strings, "encodings": encodings, "columns": columns}
+
+
+def _compact_json(value: Any) -> str:
+    return app.json.dumps(value, separators=(",", ":"))
+
+
+def _json_chunks(value: Any, slice_size: int = 500) -> Iterator[str]:
+    """``value`` as compact JSON in pieces: dicts entry by entry, long lists a slice at a time."""
+    if isinstance(value, dict):
+        items = sorted(value.items()) if app.json.sort_keys else value.items()
+        yield "{"
+        for index, (key, item) in enumerate(items):
+            yield ("," if index else "") + _compact_json(key) + ":"
+            yield from _json_chunks(item, slice_size)
+        yield "}"
+    elif isinstance(value, list) and len(value) > slice_size:
+        for start in range(0, len(value), slice_size):
+            yield ("," if start else "[") + _compact_json(value[start : start + slice_size])[1:-1]
+        yield "]"
+    else:
+        yield _compact_json(value)
+
+
+def _buffered(chunks: Iterable[str], buffer_size: int = 1 << 16) -> Iterator[str]:
+    """Join small ``chunks`` into pieces of about ``buffer_size`` characters."""
+    pending: List[str] = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield "".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending)
+
+
+def _stream_json(payload: Dict[str, Any]) -> Iterator[str]:
+    """Encode ``payload`` as it is sent."""
+    yield from _buffered(_json_chunks(payload))
+    yield "\n"
+
+
+def _wants_columnar() -> bool:
+    """Columnar events requested via ``format=columnar`` or an Accept of COLUMNAR_MIMETYPE."""
+    return request.args.get("format") == "columnar" or (
+        request.accept_mimetypes.best_match(["application/json", COLUMNAR_MIMETYPE]) == COLUMNAR_MIMETYPE
+    )
+
+
+def _boot_validators(dataset: Dict[str, Any], boot: Dict[str, Any]) -> Tuple[str, datetime]:
+    """ETag and Last-Modified for a boot API response. A boot's rows only
+    change along with boots.version, and dataset updated_at moves with it."""
+    etag = _etag("boot", dataset["id"], boot["boot_id"], boot["version"], request.full_path, _wants_columnar())
+    return etag, _dataset_last_modified(dataset)
+
+
+def _events_response(
+    payload: Dict[str, Any], validators: Optional[Tuple[str, datetime]] = None
+) -> Response:
+    """Streamed JSON response for an events page, columnar if the client asked for it."""
+    columnar = _wants_columnar()
+    if columnar:
+        payload = dict(payload)
+        payload["columnar"] = _columnar_events(payload.pop("events"))
+    response = Response(_stream_json(payload), mimetype=COLUMNAR_MIMETYPE if columnar else "application/json")
+    response.vary.add("Accept")
+    if validators:
+        _set_validators(response, *validators)
+    return response
+
+
+@app.route("/api/datasets/<int:dataset_id>/boots/<boot_id>/events")
+def boot_events_api(dataset_id: int, boot_id: str):
+    dataset = get_dataset(dataset_id)
+    boot = get_boot_meta(dataset_id, boot_id) if dataset else None
+    if not boot:
+        return jsonify({"error": "not_found"}), 404
+    validators = _boot_validators(dataset, boot)
+    not_modified = _not_modified(*validators)
+    if not_modified:
+        return not_modified
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", default=1000, type=int)
+    limit = max(1, min(app.config["EVENTS_PAGE_MAX"], limit))
+    fields_raw = request.args.get("fields") or ""
+    fields = [f.strip() for f in fields_raw.split(",") if f.strip()] or None
+    try:
+        page = list_boot_events(dataset, boot_id, after_row_id=after, limit=limit, fields=fields)
+    except ValueError:
+        return jsonify({"error": "invalid_fields"}), 400
+    return _events_response({"dataset_id": dataset_id, "boot_id": boot_id, **page}, validators)
+
+
+@app.route("/api/datasets/<int:dataset_id>/boots/<boot_id>/search")
+def boot_search_api(dataset_id: int, boot_id: str):
+    dataset = get_dataset(dataset_id)
+    boot = get_boot_meta(dataset_id, boot_id) if dataset else None
+    if not boot:
+        return jsonify({"error": "not_found"}), 404
+    validators = _boot_validators(dataset, boot)
+    not_modified = _not_modified(*validators)
+    if not_modified:
+        return not_modified
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", default=1000, type=int)
+    limit = max(1, min(app.config["EVENTS_PAGE_MAX"], limit))
+    query = request.args.get("q", "")
+    tag = request.args.get("tag") or None
+    try:
+        page = search_boot_events(dataset, boot_id, query, after_row_id=after, limit=limit, tag=tag)
+    except ValueError as exc:
+        return jsonify({"error": "invalid_query", "detail": str(exc)}), 400
+    return _set_validators(
+        jsonify({"dataset_id": dataset_id, "boot_id": boot_id, "query": query, "tag": tag, **page}), *validators
+    )
+
+
+def _parse_window_bound(value: Optional[str], by: str) -> Optional[float]:
+    """Window bound from a query arg: ISO-8601 or epoch ms for utctime, a number for norm_time."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        if by != "epoch_ms":
+            raise
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp() * 1000
+
+
+@app.route("/api/datasets/<int:dataset_id>/boots/<boot_id>/window")
+def boot_window_api(dataset_id: int, boot_id: str):
+    dataset = get_dataset(dataset_id)
+    boot = get_boot_meta(dataset_id, boot_id) if dataset else None
+    if not boot:
+        return jsonify({"error": "not_found"}), 404
+    validators = _boot_validators(dataset, boot)
+    not_modified = _not_modified(*validators)
+    if not_modified:
+        return not_modified
+    by = {"utctime": "epoch_ms", "norm_time": "norm_time"}.get(request.args.get("by", "utctime"))
+    if by is None:
+        return jsonify({"error": "invalid_window_key"}), 400
+    try:
+        start = _parse_window_bound(request.args.get("from"), by)
+        end = _parse_window_bound(request.args.get("to"), by)
+    except ValueError:
+        return jsonify({"error": "invalid_window"}), 400
+    limit = request.args.get("limit", default=1000, type=int)
+    limit = max(1, min(app.config["EVENTS_PAGE_MAX"], limit))
+    fields_raw = request.args.get("fields") or ""
+    fields = [f.strip() for f in fields_raw.split(",") if f.strip()] or None
+    try:
+        page = list_boot_events_in_window(
+            dataset, boot_id, start=start, end=end, by=by, cursor=request.args.get("cursor"),
+            limit=limit, fields=fields,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc).split(":", 1)[0]}), 400
+    return _events_response({"dataset_id": dataset_id, "boot_id": boot_id, **page}, validators)
+
+
+HISTOGRAM_RESOLUTIONS = {"1s": 1000, "10s": 10_000, "1m": 60_000, "5m": 300_000, "1h": 3_600_000}
+
+
+@app.route("/api/datasets/<int:dataset_id>/boots/<boot_id>/histogram")
+def boot_histogram_api(dataset_id: int, boot_id: str):
+    dataset = get_dataset(dataset_id)
+    boot = get_boot_meta(dataset_id, boot_id) if dataset else None
+    if not boot:
+        return jsonify({"error": "not_found"}), 404
+    validators = _boot_validators(dataset, boot)
+    not_modified = _not_modified(*validators)
+    if not_modified:
+        return not_modified
+    resolution_raw = request.args.get("resolution", "auto")
+    if resolution_raw != "auto" and resolution_raw not in HISTOGRAM_RESOLUTIONS:
+        return jsonify({"error": "invalid_resolution"}), 400
+    max_buckets = request.args.get("buckets", default=500, type=int)
+    max_buckets = max(1, min(app.config["HISTOGRAM_MAX_BUCKETS"], max_buckets))
+    try:
+        start = _parse_window_bound(request.args.get("from"), "epoch_ms")
+        end = _parse_window_bound(request.args.get("to"), "epoch_ms")
+    except ValueError:
+        return jsonify({"error": "invalid_window"}), 400
+    try:
+        histogram = get_boot_histogram(
+            dataset, boot_id, start=start, end=end,
+            resolution_ms=HISTOGRAM_RESOLUTIONS.get(resolution_raw),
+            dimension=request.args.get("dimension", "color"), max_buckets=max_buckets,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc).split(":", 1)[0]}), 400
+    return _set_validators(jsonify({"dataset_id": dataset_id, "boot_id": boot_id, **histogram}), *validators)
+
+
+def _ndjson_lines(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for event in events:
+        yield _compact_json(event) + "\n"
+
+
+def _csv_lines(events: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    """CSV with a header row; lists and objects are written as JSON, nulls as empty cells."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    for event in events:
+        writer.writerow(
+            [_compact_json(value) if isinstance(value, (dict, list)) else value for value in event.values()]
+        )
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    yield out.getvalue()
+
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@app.route("/api/datasets/<int:dataset_id>/boots/<boot_id>/export")
+def boot_export_api(dataset_id: int, boot_id: str):
+    """A whole boot, or the events matching ``q``, as NDJSON or CSV, streamed."""
+    dataset = get_dataset(dataset_id)
+    boot = get_boot_meta(dataset_id, boot_id) if dataset else None
+    if not boot:
+        return jsonify({"error": "not_found"}), 404
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "invalid_format"}), 400
+    validators = _boot_validators(dataset, boot)
+    not_modified = _not_modified(*validators)
+    if not_modified:
+        return not_modified
+    fields_raw = request.args.get("fields") or ""
+    fields = [f.strip() for f in fields_raw.split(",") if f.strip()] or None
+    query = request.args.get("q") or None
+    try:
+        fields, events = export_boot_events(dataset, boot_id, query=query, fields=fields)
+    except ValueError as exc:
+        error = "invalid_fields" if str(exc).startswith("unknown_fields") else "invalid_query"
+        return jsonify({"error": error, "detail": str(exc)}), 400
+    if export_format == "csv":
+        lines = _csv_lines(events, fields)
+    else:
+        lines = _ndjson_lines(events)
+    response = Response(stream_with_context(_buffered(lines)), mimetype=EXPORT_FORMATS[export_format])
+    response.headers["Content-Disposition"] = f'attachment; filename="{secure_filename(boot_id) or "boot"}.{export_format}"'
+    return _set_validators(response, *validators)
+
+
 @app.route("/api/bookmarks", methods=["GET", "POST"])
 def bookmarks_api():
     if not g.current_user:
@@ -475,7 +991,7 @@ def bookmarks_api():
         if not dataset_id or not boot_id:
             return jsonify({"error": "missing_params"}), 400
         bookmarks = list_bookmarks_for_user(user_id, dataset_id, boot_id)
-        return jsonify({"bookmarks": bookmarks})
+        return _conditional_json({"bookmarks": bookmarks})
 
     payload = request.get_json(silent=True) or {}
     dataset_id = payload.get("dataset_id")
@@ -502,7 +1018,7 @@ def comments_api():
         if not dataset_id or not boot_id:
             return jsonify({"error": "missing_params"}), 400
         comments = list_comments_for_boot(dataset_id, boot_id)
-        return jsonify({"comments": comments})
+        return _conditional_json({"comments": comments})
 
     if not g.current_user:
         return jsonify({"error": "login_required"}), 401
@@ -532,4 +1048,5 @@ def comments_api():
 
 
 if __name__ == "__main__":
+    bootstrap()
     app.run(debug=True, port=8080)
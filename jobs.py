@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask, current_app
+
+# Finished jobs are kept this long so clients can still poll for the result.
+JOB_RETENTION_SECONDS = 3600
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class JobContext:
+    """Handle given to a running job for reporting progress and results."""
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+        self._completed_rows = 0
+
+    def progress(self, rows: int) -> None:
+        """Rows ingested so far for the boot currently being loaded."""
+        _update_job(self.job_id, rows_ingested=self._completed_rows + rows)
+
+    def add_boot(self, boot_id: str, rows: int) -> None:
+        self._completed_rows += rows
+        with _jobs_lock:
+            job = _jobs[self.job_id]
+            job["boot_ids"].append(boot_id)
+            job["rows_ingested"] = self._completed_rows
+
+    def set_message(self, message: str) -> None:
+        _update_job(self.job_id, message=message)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(current_app.config.get("INGEST_WORKERS", 2)),
+                thread_name_prefix="ingest",
+            )
+        return _executor
+
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def _prune_jobs() -> None:
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    with _jobs_lock:
+        for job_id in [
+            job_id
+            for job_id, job in _jobs.items()
+            if job["finished_ts"] is not None and job["finished_ts"] < cutoff
+        ]:
+            del _jobs[job_id]
+
+
+def _run_job(app: Flask, job_id: str, work: Callable[[JobContext], None]) -> None:
+    with app.app_context():
+        _update_job(
+            job_id, state="running", started_at=datetime.utcnow().isoformat(), started_ts=time.time()
+        )
+        try:
+            work(JobContext(job_id))
+        except ValueError as exc:
+            _update_job(job_id, state="failed", error=str(exc))
+        except Exception:
+            app.logger.exception("Ingest job %s failed", job_id)
+            _update_job(job_id, state="failed", error="internal_error")
+        else:
+            _update_job(job_id, state="done")
+        finally:
+            _update_job(job_id, finished_at=datetime.utcnow().isoformat(), finished_ts=time.time())
+
+
+def submit_job(
+    kind: str, dataset_id: int, user_id: Optional[int], work: Callable[[JobContext], None]
+) -> str:
+    """Queue ``work`` on the ingest worker pool and return the new job id.
+
+    ``work`` runs inside an app context. A ValueError it raises marks the
+    job failed with that message; any other exception is logged and reported
+    as internal_error.
+    """
+    _prune_jobs()
+    job_id = secrets.token_urlsafe(8)
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "state": "queued",
+            "dataset_id": dataset_id,
+            "user_id": user_id,
+            "rows_ingested": 0,
+            "boot_ids": [],
+            "message": "",
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "started_ts": None,
+            "finished_ts": None,
+        }
+    _get_executor().submit(_run_job, current_app._get_current_object(), job_id, work)
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Snapshot of a job with its current throughput, or None if unknown/expired."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        snapshot = dict(job, boot_ids=list(job["boot_ids"]))
+    started_ts = snapshot.pop("started_ts")
+    finished_ts = snapshot.pop("finished_ts")
+    elapsed = ((finished_ts or time.time()) - started_ts) if started_ts else 0.0
+    snapshot["elapsed_seconds"] = round(elapsed, 3)
+    snapshot["events_per_second"] = round(snapshot["rows_ingested"] / elapsed, 1) if elapsed > 0 else 0.0
+    return snapshot
@@ -0,0 +1,962 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Server-side port of the query language in templates/components/search.js
+# (see docs/search_syntax.rst). Matching deliberately follows the browser's
+# JavaScript semantics -- String()/Number() coercions included -- so a query
+# selects the same rows whichever side evaluates it. Keep the two in sync.
+
+Node = Dict[str, Any]
+
+# Stand-in for JavaScript's ``undefined`` (a missing key), which the browser
+# evaluator treats differently from ``null``.
+_MISSING = object()
+
+# Columns of the logs table that compile_sql can push conditions down to.
+TEXT_COLUMNS = frozenset(
+    ["name", "description", "color", "system", "subsystem", "unit", "code", "set_clear", "utctime", "event_id"]
+)
+NUMERIC_COLUMNS = frozenset(["row_id", "norm_time", "a_time", "b_time", "c_time", "d_time"])
+
+_NUMBER_RE = re.compile(r"[+-]?(?:\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)")
+_RADIX_RE = re.compile(r"0(?:[xX][0-9a-fA-F]+|[oO][0-7]+|[bB][01]+)")
+_WHITESPACE = " \t\n\r"
+_NON_WORD = set(_WHITESPACE) | set('():"|~><')
+_EXPRESSION_STARTS = ("LPAREN", "WORD", "PHRASE", "AND", "NOT", "MINUS", "FIELD")
+
+
+# --- JavaScript coercions -------------------------------------------------
+
+
+def _js_number_str(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value.is_integer() and abs(value) < 1e21:
+        return str(int(value))
+    text = repr(value)
+    if "e" in text:
+        mantissa, exponent = text.split("e")
+        sign = "-" if exponent.startswith("-") else "+"
+        text = f"{mantissa}e{sign}{exponent.lstrip('+-').lstrip('0') or '0'}"
+    return text
+
+
+def _js_string(value: Any) -> str:
+    """JavaScript String(value)."""
+    if value is _MISSING:
+        return "undefined"
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return _js_number_str(value)
+    if isinstance(value, list):
+        return ",".join("" if item is None or item is _MISSING else _js_string(item) for item in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return str(value)
+
+
+def _js_number(value: Any) -> float:
+    """JavaScript Number(value)."""
+    if value is _MISSING or isinstance(value, dict):
+        return math.nan
+    if value is None:
+        return 0.0
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    if isinstance(value, list):
+        value = _js_string(value)
+    text = str(value).strip()
+    if not text:
+        return 0.0
+    if _NUMBER_RE.fullmatch(text):
+        return float(text)
+    if _RADIX_RE.fullmatch(text):
+        return float(int(text, 0))
+    if text.lstrip("+-") == "Infinity":
+        return -math.inf if text.startswith("-") else math.inf
+    return math.nan
+
+
+def to_comparable(value: Any) -> str:
+    if value is None or value is _MISSING:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (bool, int, float)):
+        return _js_string(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+@lru_cache(maxsize=256)
+def glob_to_regex(pattern: str) -> "re.Pattern[str]":
+    """``*`` matches anything; like the browser, ``?`` is left as a regex quantifier."""
+    escaped = re.sub(r"([.+^${}()|\[\]\\])", r"\\\1", pattern)
+    try:
+        return re.compile(escaped.replace("*", ".*"), re.IGNORECASE)
+    except re.error as exc:
+        raise ValueError(f"Invalid pattern {pattern!r}: {exc}") from None
+
+
+def _glob_match(pattern: str, text: str) -> bool:
+    return glob_to_regex(pattern).fullmatch(text) is not None
+
+
+# --- Field access ---------------------------------------------------------
+
+
+def _lookup(current: Any, part: str) -> Any:
+    if isinstance(current, dict):
+        return current.get(part, _MISSING)
+    if part.isdigit() and part == str(int(part)) and int(part) < len(current):
+        return current[int(part)]
+    if part == "length":
+        return len(current)
+    return _MISSING
+
+
+def get_field_value(event: Any, path: str) -> Any:
+    if event is None or event is _MISSING or not path:
+        return None
+    current = event
+    for part in path.split("."):
+        if current is None or current is _MISSING or not isinstance(current, (dict, list)):
+            return None
+        current = _lookup(current, part)
+    return current
+
+
+def _walk_objects(root: Any, visit: Callable[[Any], None]) -> None:
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, (dict, list)) or id(node) in seen:
+            continue
+        seen.add(id(node))
+        visit(node)
+        children = node if isinstance(node, list) else list(node.values())
+        stack.extend(reversed(children))
+
+
+def _collect_deep_values(root: Any, path_parts: List[str]) -> List[Any]:
+    path = ".".join(path_parts)
+    results: List[Any] = []
+
+    def visit(node: Any) -> None:
+        value = get_field_value(node, path)
+        if value is not None and value is not _MISSING:
+            results.append(value)
+
+    _walk_objects(root, visit)
+    return results
+
+
+def _collect_any_values(root: Any) -> List[Any]:
+    results: List[Any] = []
+    seen = set()
+
+    def walk(node: Any) -> None:
+        if not isinstance(node, (dict, list)) or id(node) in seen:
+            return
+        seen.add(id(node))
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+            return
+        for value in node.values():
+            results.append(value)
+            walk(value)
+
+    walk(root)
+    return results
+
+
+def _collect_key_names(root: Any) -> List[str]:
+    results: List[str] = []
+
+    def visit(node: Any) -> None:
+        if isinstance(node, dict):
+            results.extend(str(key) for key in node)
+
+    _walk_objects(root, visit)
+    return results
+
+
+def get_field_values(event: Any, path: str) -> List[Any]:
+    if event is None or not path or path == "$":
+        return []
+    if path == "$.*":
+        return _collect_any_values(event)
+    if path.startswith("$."):
+        sub_path = path[2:]
+        return _collect_deep_values(event, sub_path.split(".")) if sub_path else []
+    deep_index = path.find("$.")
+    if deep_index == -1:
+        return [get_field_value(event, path)]
+    base_path = path[:deep_index]
+    sub_path = path[deep_index + 2 :]
+    base_value = get_field_value(event, base_path) if base_path else event
+    if base_value is None or base_value is _MISSING:
+        return []
+    if not sub_path or sub_path == "*":
+        return _collect_any_values(base_value)
+    if sub_path.endswith(".*"):
+        targets = _collect_deep_values(base_value, sub_path[:-2].split("."))
+        return [value for target in targets for value in _collect_any_values(target)]
+    return _collect_deep_values(base_value, sub_path.split("."))
+
+
+# --- Tokenizer and parser -------------------------------------------------
+
+
+class _TokenStream:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.i = 0
+        self.buffered: Optional[Dict[str, Any]] = None
+
+    def error(self, message: str, token: Optional[Dict[str, Any]] = None) -> ValueError:
+        start = (token or self.buffered or {"start": self.i})["start"]
+        return ValueError(f"{message} at {start}")
+
+    def peek(self) -> Dict[str, Any]:
+        if self.buffered is None:
+            self.buffered = self._read_token()
+        return self.buffered
+
+    def next(self) -> Dict[str, Any]:
+        token = self.peek()
+        self.buffered = None
+        return token
+
+    def match(self, kind: str) -> bool:
+        if self.peek()["type"] == kind:
+            self.next()
+            return True
+        return False
+
+    def expect(self, kind: str, message: str) -> Dict[str, Any]:
+        token = self.peek()
+        if token["type"] != kind:
+            raise self.error(message, token)
+        return self.next()
+
+    def _read_token(self) -> Dict[str, Any]:
+        text = self.text
+        while self.i < len(text) and text[self.i] in _WHITESPACE:
+            self.i += 1
+        start = self.i
+        if start >= len(text):
+            return {"type": "EOF", "start": start}
+
+        ch = text[start]
+        prev = text[start - 1] if start > 0 else ""
+        single = {"(": "LPAREN", ")": "RPAREN", "|": "OR"}
+        if ch in single:
+            self.i += 1
+            return {"type": single[ch], "start": start}
+        if ch == "~":
+            self.i += 1
+            return {"type": "CONTAINS", "op": "~", "start": start}
+        if ch in "<>":
+            return {"type": "COMP", "op": self._read_comparison(), "start": start}
+        if ch == "-" and (start == 0 or prev in _WHITESPACE or prev == "("):
+            self.i += 1
+            return {"type": "MINUS", "start": start}
+        if ch == '"':
+            return {"type": "PHRASE", "value": self._read_phrase(), "start": start}
+
+        word = self._read_word()
+        if self.i < len(text):
+            follower = text[self.i]
+            if follower in ":~":
+                self.i += 1
+                return {"type": "FIELD", "key": word, "op": follower, "start": start}
+            if follower in "<>":
+                return {"type": "FIELD", "key": word, "op": self._read_comparison(), "start": start}
+        upper = word.upper()
+        if upper in ("OR", "AND", "NOT"):
+            return {"type": upper, "start": start}
+        return {"type": "WORD", "value": word, "start": start}
+
+    def _read_comparison(self) -> str:
+        op = self.text[self.i]
+        self.i += 1
+        if self.i < len(self.text) and self.text[self.i] == "=":
+            op += "="
+            self.i += 1
+        return op
+
+    def _read_word(self) -> str:
+        start = self.i
+        while self.i < len(self.text) and self.text[self.i] not in _NON_WORD:
+            self.i += 1
+        if self.i == start:
+            raise self.error("Expected word")
+        return self.text[start : self.i]
+
+    def _read_phrase(self) -> str:
+        self.i += 1
+        out = []
+        while self.i < len(self.text):
+            ch = self.text[self.i]
+            if ch == "\\":
+                if self.i + 1 >= len(self.text):
+                    raise self.error("Unterminated escape in string")
+                escaped = self.text[self.i + 1]
+                out.append({"n": "\n", "t": "\t", "r": "\r"}.get(escaped, escaped))
+                self.i += 2
+                continue
+            if ch == '"':
+                self.i += 1
+                return "".join(out)
+            out.append(ch)
+            self.i += 1
+        raise self.error("Unterminated quote")
+
+
+def _make_and(nodes: List[Node]) -> Node:
+    flat: List[Node] = []
+    for node in nodes:
+        flat.extend(node["terms"] if node["type"] == "AND" else [node])
+    return flat[0] if len(flat) == 1 else {"type": "AND", "terms": flat}
+
+
+def _make_or(nodes: List[Node]) -> Node:
+    flat: List[Node] = []
+    for node in nodes:
+        flat.extend(node["terms"] if node["type"] == "OR" else [node])
+    return flat[0] if len(flat) == 1 else {"type": "OR", "terms": flat}
+
+
+def _scope_field(field: str, node: Node, op: str) -> Node:
+    if node["type"] == "TEXT":
+        return {"type": "FILTER", "key": field, "op": op, "value": node}
+    if node["type"] == "AND":
+        return _make_and([_scope_field(field, term, op) for term in node["terms"]])
+    if node["type"] == "OR":
+        return _make_or([_scope_field(field, term, op) for term in node["terms"]])
+    if node["type"] == "NOT":
+        return {"type": "NOT", "term": _scope_field(field, node["term"], op)}
+    return node
+
+
+def _parse_expression(ts: _TokenStream, min_bp: int) -> Node:
+    left = _parse_primary(ts)
+    while True:
+        kind = ts.peek()["type"]
+        if kind == "OR":
+            op, lbp = "OR", 1
+        elif kind == "AND" or kind in _EXPRESSION_STARTS:
+            op, lbp = "AND", 2
+        else:
+            break
+        if lbp < min_bp:
+            break
+        if kind in ("OR", "AND"):
+            ts.next()
+        right = _parse_expression(ts, lbp + 1)
+        left = _make_and([left, right]) if op == "AND" else _make_or([left, right])
+    return left
+
+
+def _parse_value(ts: _TokenStream) -> Node:
+    token = ts.peek()
+    if token["type"] in ("WORD", "PHRASE"):
+        ts.next()
+        return {"type": "TEXT", "value": token["value"], "kind": token["type"].lower()}
+    raise ts.error("Expected a field value", token)
+
+
+def _parse_primary(ts: _TokenStream) -> Node:
+    token = ts.next()
+    kind = token["type"]
+    if kind == "EOF":
+        return {"type": "EMPTY"}
+    if kind == "WORD":
+        if ts.peek()["type"] in ("COMP", "CONTAINS"):
+            comparison = ts.next()
+            return {"type": "FILTER", "key": token["value"], "op": comparison["op"], "value": _parse_value(ts)}
+        return {"type": "TEXT", "value": token["value"], "kind": "word"}
+    if kind == "PHRASE":
+        return {"type": "TEXT", "value": token["value"], "kind": "phrase"}
+    if kind in ("MINUS", "NOT"):
+        return {"type": "NOT", "term": _parse_expression(ts, 3)}
+    if kind == "LPAREN":
+        expr = _parse_expression(ts, 0)
+        ts.expect("RPAREN", "Expected ')'")
+        return expr
+    if kind == "FIELD":
+        if token["op"] in (":", "~") and ts.match("LPAREN"):
+            expr = _parse_expression(ts, 0)
+            ts.expect("RPAREN", "Expected ')'")
+            return _scope_field(token["key"], expr, token["op"])
+        return {"type": "FILTER", "key": token["key"], "op": token["op"], "value": _parse_value(ts)}
+    raise ts.error("Expected a term", token)
+
+
+def parse_query(query: Optional[str]) -> Node:
+    """Parse a search query into an AST; syntax errors raise ValueError."""
+    ts = _TokenStream(query or "")
+    if ts.peek()["type"] == "EOF":
+        return {"type": "EMPTY"}
+    ast = _parse_expression(ts, 0)
+    ts.expect("EOF", "Unexpected extra input")
+    return ast
+
+
+# --- Evaluation -----------------------------------------------------------
+
+
+def _strip_quotes(term: str) -> str:
+    return term[1:-1] if len(term) >= 2 and term.startswith('"') and term.endswith('"') else term
+
+
+def _match_key_name_term(root: Any, term: str) -> bool:
+    cleaned = _strip_quotes(term)
+    if "*" in cleaned:
+        return any(_glob_match(cleaned, key) for key in _collect_key_names(root))
+    lowered = cleaned.lower()
+    return any(key.lower() == lowered for key in _collect_key_names(root))
+
+
+def match_field_term(event: Dict[str, Any], field: str, term: str) -> bool:
+    if field == "$":
+        return _match_key_name_term(event, term)
+    cleaned = _strip_quotes(term)
+    lowered = cleaned.lower()
+
+    def apply_match(candidate: Any) -> bool:
+        if candidate is None or candidate is _MISSING:
+            return False
+        text = to_comparable(candidate)
+        if "*" in term:
+            return _glob_match(cleaned, text)
+        if field == "name":
+            return _glob_match(cleaned + "*", text)
+        return text.lower() == lowered
+
+    for value in get_field_values(event, field):
+        if isinstance(value, list):
+            if any(apply_match(item) for item in value):
+                return True
+        elif isinstance(value, bool):
+            if lowered == ("true" if value else "false"):
+                return True
+        elif isinstance(value, (int, float)):
+            if _js_number_str(value) == cleaned:
+                return True
+        elif apply_match(value):
+            return True
+    return False
+
+
+def match_bare_term(event: Dict[str, Any], term: str) -> bool:
+    if not term:
+        return True
+    if _glob_match(term + "*", to_comparable(event.get("name") or "")):
+        return True
+    lowered = term.lower()
+    for key, value in event.items():
+        if key == "data":
+            continue
+        if isinstance(value, list):
+            if any(to_comparable(item).lower() == lowered for item in value):
+                return True
+            continue
+        text = to_comparable(value)
+        if text and text.lower() == lowered:
+            return True
+    return False
+
+
+def _contains_field(event: Dict[str, Any], key: str, raw_value: str) -> bool:
+    needle = raw_value.lower()
+    if key == "$":
+        return any(needle in name.lower() for name in _collect_key_names(event))
+
+    def contains(value: Any) -> bool:
+        return value is not None and value is not _MISSING and needle in _js_string(value).lower()
+
+    for value in get_field_values(event, key):
+        if isinstance(value, list):
+            if any(contains(item) for item in value):
+                return True
+        elif contains(value):
+            return True
+    return False
+
+
+_COMPARISONS: Dict[str, Callable[[float, float], bool]] = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def _compare_field(event: Dict[str, Any], key: str, raw_value: str, op: str) -> bool:
+    if key == "$":
+        return False
+    target = _js_number(raw_value)
+    if not math.isfinite(target):
+        return False
+    compare = _COMPARISONS[op]
+
+    def compare_one(value: Any) -> bool:
+        number = _js_number(value)
+        return math.isfinite(number) and compare(number, target)
+
+    for value in get_field_values(event, key):
+        if isinstance(value, list):
+            if any(compare_one(item) for item in value):
+                return True
+        elif compare_one(value):
+            return True
+    return False
+
+
+def _eval_filter(node: Node, event: Dict[str, Any]) -> bool:
+    key = node["key"].lower()
+    op = node["op"]
+    value_node = node.get("value")
+    if not value_node or value_node["type"] != "TEXT" or value_node.get("value") is None:
+        return False
+    raw = value_node["value"]
+    if key == "$" and op not in (":", "~"):
+        return False
+    if op == ":":
+        return match_field_term(event, key, raw)
+    if op == "~":
+        return _contains_field(event, key, raw)
+    if op not in _COMPARISONS:
+        return False
+    return _compare_field(event, key, raw, op)
+
+
+def evaluate(node: Optional[Node], event: Dict[str, Any]) -> bool:
+    if not node:
+        return True
+    kind = node["type"]
+    if kind == "AND":
+        return all(evaluate(term, event) for term in node["terms"])
+    if kind == "OR":
+        return any(evaluate(term, event) for term in node["terms"])
+    if kind == "NOT":
+        return not evaluate(node["term"], event)
+    if kind == "TEXT":
+        return match_bare_term(event, node["value"])
+    if kind == "FILTER":
+        return _eval_filter(node, event)
+    return True
+
+
+# --- Full-text index ------------------------------------------------------
+
+# Trigram FTS5 table (one row per logs row, rowid = logs.id), so any
+# substring of three or more characters is an index lookup.
+FTS_TABLE = "logs_fts"
+FTS_COLUMNS = ("name", "description", "other", "data")
+# Short, high-churn values that would bloat the index; conditions on them use the columns.
+_FTS_SKIPPED = NUMERIC_COLUMNS | {"utctime"}
+
+
+def _data_strings(value: Any, out: List[str]) -> bool:
+    """Append String() of ``value`` and of everything nested in it; True if it holds an object."""
+    if value.__class__ is str:
+        out.append(value)
+        return False
+    if isinstance(value, dict):
+        for child in value.values():
+            _data_strings(child, out)
+        return True
+    if value is None:
+        return False
+    out.append(_js_string(value))
+    has_dict = False
+    if isinstance(value, list):
+        for item in value:
+            has_dict = _data_strings(item, out) or has_dict
+    return has_dict
+
+
+def fts_document(event: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """Text indexed for ``event``, one string per FTS_COLUMNS entry.
+
+    Each column holds every string the evaluator could compare against for
+    the fields it covers, so an FTS hit is necessary for a match: ``other``
+    has the remaining top-level fields and array items except the numeric
+    and utctime columns, and ``data`` every nested value as String() would
+    render it.
+    """
+    other: List[str] = []
+    has_dict = False
+    for key, value in event.items():
+        if key in ("name", "description", "data") or key in _FTS_SKIPPED:
+            continue
+        for item in value if isinstance(value, list) else (value,):
+            if item.__class__ is str:
+                other.append(item)
+                continue
+            if isinstance(item, (dict, list)):
+                other.append(to_comparable(item))
+            has_dict = _data_strings(item, other) or has_dict
+    data: List[str] = []
+    data_has_dict = _data_strings(event.get("data"), data)
+    if has_dict:
+        other.append("[object Object]")
+    if data_has_dict:
+        data.append("[object Object]")
+    return (
+        to_comparable(event.get("name")),
+        to_comparable(event.get("description")),
+        "\n".join(other),
+        "\n".join(data),
+    )
+
+
+def _fts_columns(key: str) -> Optional[Tuple[str, ...]]:
+    # "$" scopes can reach the skipped top-level columns, so they are not covered.
+    if key.startswith("$"):
+        return None
+    base = re.split(r"\$?\.", key, maxsplit=1)[0]
+    if base in _FTS_SKIPPED:
+        return None
+    return (base,) if base in ("name", "description", "data") else ("other",)
+
+
+def _compile_skipped_equals(term: str) -> Optional[Tuple[str, List[Any]]]:
+    """Bare-term equality against the columns fts_document leaves out."""
+    if not term.isascii():
+        return None
+    clauses = ["utctime = ? COLLATE NOCASE"]
+    params: List[Any] = [term]
+    if _NUMBER_RE.fullmatch(term):
+        for column in sorted(NUMERIC_COLUMNS):
+            clauses.append(f"{column} = ?")
+            params.append(float(term))
+    for column in sorted(NUMERIC_COLUMNS):
+        clauses.append(f"typeof({column}) NOT IN ('integer', 'real', 'null')")
+    return " OR ".join(clauses), params
+
+
+def _compile_fts(node: Node) -> Optional[Tuple[str, List[Any]]]:
+    if node["type"] == "TEXT":
+        needle = node["value"]
+        columns: Optional[Tuple[str, ...]] = ("name", "description", "other")
+        if "*" in needle or "?" in needle:
+            return None
+    else:
+        value_node = node.get("value") or {}
+        raw = value_node.get("value")
+        if value_node.get("type") != "TEXT" or raw is None:
+            return None
+        key = node["key"].lower()
+        columns = _fts_columns(key)
+        if node["op"] == "~":
+            needle = raw
+        elif node["op"] == ":":
+            needle = _strip_quotes(raw)
+            # Wildcards, regex quantifiers and whole objects/arrays are left to the scan.
+            if "*" in raw or "?" in needle or needle.startswith(("{", "[")):
+                return None
+        else:
+            return None
+    # The trigram tokenizer cannot match anything shorter than three characters.
+    if columns is None or len(needle) < 3:
+        return None
+    match = "{%s} : \"%s\"" % (" ".join(columns), needle.replace('"', '""'))
+    sql = f"id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)"
+    if node["type"] == "TEXT":
+        skipped = _compile_skipped_equals(needle)
+        if skipped is None:
+            return None
+        return f"({sql} OR {skipped[0]})", [match] + skipped[1]
+    return sql, [match]
+
+
+# --- Flattened key/value table --------------------------------------------
+
+# One row per value nested in an event's data (and in any objects inside
+# channels): (boot_id, row_id, path, key, value_text, value_num). Paths are
+# dotted, lower-cased keys from the event root with list indexes dropped, so
+# every item of a list shares its list's path.
+KV_TABLE = "log_kv"
+TOP_LEVEL_FIELDS = TEXT_COLUMNS | NUMERIC_COLUMNS | {"channels", "data", "tags"}
+_MAX_CHAR = "\U0010ffff"
+
+
+def _flatten(value: Any, path: str, key: str, out: List[Tuple[str, str, Optional[str], Optional[float]]]) -> None:
+    if isinstance(value, dict):
+        out.append((path, key, None, None))
+        for child_key, child in value.items():
+            child_key = str(child_key).lower()
+            _flatten(child, f"{path}.{child_key}", child_key, out)
+    elif isinstance(value, list):
+        out.append((path, key, None, None))
+        for item in value:
+            _flatten(item, path, key, out)
+    else:
+        number = _js_number(value)
+        text = None if value is None else to_comparable(value).lower()
+        out.append((path, key, text, number if math.isfinite(number) else None))
+
+
+def flatten_event(event: Dict[str, Any]) -> List[Tuple[str, str, Optional[str], Optional[float]]]:
+    """(path, key, value_text, value_num) rows for ``event``'s KV_TABLE entries.
+
+    value_text is the lower-cased string the evaluator compares with ``:``;
+    value_num is JavaScript's Number() of the value, NULL when not finite.
+    """
+    out: List[Tuple[str, str, Optional[str], Optional[float]]] = []
+    if event.get("data") is not None:
+        _flatten(event["data"], "data", "data", out)
+    for item in event.get("channels") or []:
+        if isinstance(item, (dict, list)):
+            _flatten(item, "channels", "channels", out)
+    return out
+
+
+def _plain_path(parts: List[str]) -> bool:
+    return all(part and not part.isdigit() and part not in ("length", "*") and "$" not in part for part in parts)
+
+
+def _compile_key_name(op: str, raw: str) -> Optional[Tuple[str, List[Any]]]:
+    # Every event has the top-level keys, so a search that can hit one matches every row.
+    if op == "~":
+        needle = raw.lower()
+        if any(needle in field for field in TOP_LEVEL_FIELDS):
+            return None
+        return "key LIKE ? ESCAPE '\\'", [f"%{_like_escape(needle)}%"]
+    cleaned = _strip_quotes(raw).lower()
+    if "*" not in cleaned:
+        return (None if cleaned in TOP_LEVEL_FIELDS else ("key = ?", [cleaned]))
+    prefix = cleaned[:-1]
+    if "*" in prefix or "?" in prefix or any(field.startswith(prefix) for field in TOP_LEVEL_FIELDS):
+        return None
+    return "key >= ? AND key < ?", [prefix, prefix + _MAX_CHAR]
+
+
+def _compile_kv_value(op: str, raw: str, exact_path: bool) -> Optional[Tuple[str, List[Any]]]:
+    if op == ":":
+        cleaned = _strip_quotes(raw)
+        if cleaned.startswith(("{", "[")):
+            return None
+        if "*" not in raw:
+            return "value_text = ?", [cleaned.lower()]
+        prefix = cleaned[:-1].lower()
+        if not cleaned.endswith("*") or "*" in prefix or "?" in prefix:
+            return None
+        return "value_text >= ? AND value_text < ?", [prefix, prefix + _MAX_CHAR]
+    if op in _COMPARISONS:
+        target = _js_number(raw)
+        if not math.isfinite(target):
+            return None
+        # A missing key part-way down an exact path reads as null, i.e. 0.
+        if exact_path and _COMPARISONS[op](0.0, target):
+            return None
+        return f"value_num {op} ?", [target]
+    return None
+
+
+def _compile_kv(node: Node, boot_id: str) -> Optional[Tuple[str, List[Any]]]:
+    key = node["key"].lower()
+    op = node["op"]
+    value_node = node.get("value") or {}
+    raw = value_node.get("value")
+    if value_node.get("type") != "TEXT" or raw is None:
+        return None
+
+    if key == "$":
+        if op not in (":", "~"):
+            return None
+        condition = _compile_key_name(op, raw)
+    elif "$." in key:
+        base, sub = key.split("$.", 1)
+        parts = sub.split(".")
+        if not _plain_path(parts):
+            return None
+        if base:
+            if base.split(".")[0] != "data" or not _plain_path(base.split(".")):
+                return None
+            where = "key = ? AND (path = ? OR path LIKE ? ESCAPE '\\')"
+            where_params: List[Any] = [parts[-1], f"{base}.{sub}", f"{_like_escape(base)}.%.{_like_escape(sub)}"]
+        else:
+            if parts[0] in TOP_LEVEL_FIELDS:
+                return None
+            where = "key = ? AND path LIKE ? ESCAPE '\\'"
+            where_params = [parts[-1], f"%.{_like_escape(sub)}"]
+        value = _compile_kv_value(op, raw, exact_path=False)
+        condition = None if value is None else (f"{where} AND {value[0]}", where_params + value[1])
+    else:
+        parts = key.split(".")
+        if parts[0] != "data" or not _plain_path(parts):
+            return None
+        value = _compile_kv_value(op, raw, exact_path=True)
+        condition = None if value is None else (f"path = ? AND {value[0]}", [key] + value[1])
+
+    if condition is None:
+        return None
+    return f"row_id IN (SELECT row_id FROM {KV_TABLE} WHERE boot_id = ? AND {condition[0]})", [boot_id] + condition[1]
+
+
+# --- Tag index ------------------------------------------------------------
+
+# Normalised event tags: TAGS_TABLE (tag_id, name) holds each distinct tag
+# once, case-insensitively, and ROW_TAGS_TABLE (boot_id, tag_id, row_id) has
+# one row per tag of each logs row. Both, like the app DB's catalog tags, hold
+# names as normalize_tag leaves them.
+TAGS_TABLE = "tags"
+ROW_TAGS_TABLE = "row_tags"
+
+
+def split_tags(value: Optional[str]) -> List[str]:
+    """The tags of a stored comma-joined tags string, as events carry them."""
+    return value.split(",") if value else []
+
+
+def normalize_tag(name: str) -> str:
+    """A tag name as the tag indexes store and look it up: without surrounding whitespace."""
+    return name.strip()
+
+
+def tag_names(value: Optional[str]) -> Set[str]:
+    """Distinct normalised, non-blank tag names of a stored tags string."""
+    return {normalize_tag(name) for name in split_tags(value)} - {""}
+
+
+def tag_condition(tag: str, boot_id: str) -> Tuple[str, List[Any]]:
+    """SQL condition selecting the boot's logs rows tagged ``tag`` (ASCII case-insensitively)."""
+    return (
+        f"row_id IN (SELECT row_id FROM {ROW_TAGS_TABLE} WHERE boot_id = ? "
+        f"AND tag_id = (SELECT tag_id FROM {TAGS_TABLE} WHERE name = ?))",
+        [boot_id, normalize_tag(tag)],
+    )
+
+
+def _compile_tags(node: Node, boot_id: str) -> Optional[Tuple[str, List[Any]]]:
+    if node["key"].lower() != "tags" or node["op"] != ":":
+        return None
+    value_node = node.get("value") or {}
+    raw = value_node.get("value")
+    if value_node.get("type") != "TEXT" or raw is None:
+        return None
+    cleaned = _strip_quotes(raw)
+    # The index folds ASCII case only; wildcards and non-ASCII terms are left to the scan.
+    # Padded names are looked up stripped, as indexed; evaluate() still compares them exactly.
+    if not normalize_tag(cleaned) or not cleaned.isascii() or "*" in raw or "?" in cleaned:
+        return None
+    return tag_condition(cleaned, boot_id)
+
+
+# --- SQL push-down --------------------------------------------------------
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Dataset files keep most text columns as ids into this (id, value) table.
+STRINGS_TABLE = "log_strings"
+
+
+def _text_test(key: str, test: str, encoded: FrozenSet[str]) -> str:
+    """``key <test>``, or for an encoded column, the same test on the strings its ids name."""
+    if key in encoded:
+        return f"{key} IN (SELECT id FROM {STRINGS_TABLE} WHERE value {test})"
+    return f"{key} {test}"
+
+
+def _compile_filter(node: Node, encoded: FrozenSet[str] = frozenset()) -> Optional[Tuple[str, List[Any]]]:
+    key = node["key"].lower()
+    op = node["op"]
+    value_node = node.get("value") or {}
+    raw = value_node.get("value")
+    if value_node.get("type") != "TEXT" or raw is None:
+        return None
+    # SQLite's LIKE and NOCASE only fold ASCII; leave other terms to the Python pass.
+    if not raw.isascii():
+        return None
+
+    if key in TEXT_COLUMNS:
+        cleaned = _strip_quotes(raw)
+        if op == "~":
+            return _text_test(key, "LIKE ? ESCAPE '\\'", encoded), [f"%{_like_escape(raw)}%"]
+        if op != ":" or "?" in cleaned:
+            return None
+        if "*" in raw or key == "name":
+            pattern = _like_escape(cleaned).replace("*", "%")
+            return _text_test(key, "LIKE ? ESCAPE '\\'", encoded), [pattern if "*" in raw else pattern + "%"]
+        return _text_test(key, "= ? COLLATE NOCASE", encoded), [cleaned]
+
+    if key in NUMERIC_COLUMNS:
+        # Non-numeric storage (NULL, stray text) goes through to Python, which
+        # applies JavaScript's Number() coercion to it.
+        loose = f"typeof({key}) NOT IN ('integer', 'real')"
+        if op in _COMPARISONS:
+            target = _js_number(raw)
+            if not math.isfinite(target):
+                return None
+            return f"({key} {op} ? OR {loose})", [target]
+        if op == ":" and _NUMBER_RE.fullmatch(raw) and "*" not in raw:
+            return f"({key} = ? OR {loose})", [float(raw)]
+    return None
+
+
+def compile_sql(
+    node: Optional[Node], fts: bool = False, boot_id: Optional[str] = None, encoded: Iterable[str] = ()
+) -> Optional[Tuple[str, List[Any]]]:
+    """SQL condition selecting a superset of the rows ``node`` matches.
+
+    Returns None when nothing can be pushed down. Rows the condition keeps
+    must still be checked with evaluate(); it only narrows the scan. With
+    ``fts``, bare terms, contains filters and filters on name, description,
+    array and data fields are answered from the FTS_TABLE index. With
+    ``boot_id``, data paths, ``$`` deep scopes and key-name searches are
+    looked up in KV_TABLE for that boot, and exact ``tags:`` filters in
+    ROW_TAGS_TABLE. Columns named in ``encoded`` hold STRINGS_TABLE ids
+    (as in log_rows) rather than text (as in the logs view).
+    """
+    if not node:
+        return None
+    encoded = frozenset(encoded)
+    kind = node["type"]
+    if kind == "TEXT":
+        return _compile_fts(node) if fts else None
+    if kind == "FILTER":
+        if boot_id is not None:
+            compiled = _compile_kv(node, boot_id) or _compile_tags(node, boot_id)
+            if compiled is not None:
+                return compiled
+        key = node["key"].lower()
+        plain_column = key in NUMERIC_COLUMNS or (key in TEXT_COLUMNS and key not in ("name", "description"))
+        if fts and (node["op"] == "~" or not plain_column):
+            compiled = _compile_fts(node)
+            if compiled is not None:
+                return compiled
+        return _compile_filter(node, encoded)
+    if kind in ("AND", "OR"):
+        parts = [compile_sql(term, fts, boot_id, encoded) for term in node["terms"]]
+        if kind == "OR" and any(part is None for part in parts):
+            return None
+        parts = [part for part in parts if part is not None]
+        if not parts:
+            return None
+        joiner = " AND " if kind == "AND" else " OR "
+        params: List[Any] = []
+        for _, part_params in parts:
+            params.extend(part_params)
+        return "(" + joiner.join(sql for sql, _ in parts) + ")", params
+    return None
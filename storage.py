@@ -1,22 +1,57 @@
 from __future__ import annotations
 
+import codecs
 import json
+import math
+import re
+import shutil
 import sqlite3
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from flask import current_app, g
 
+import search
+
+
+def _connect(path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open an app or dataset DB in WAL mode with the configured busy timeout.
+
+    See docs/concurrency.rst for the locking model these settings assume.
+    """
+    busy_timeout_ms = int(current_app.config.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    # Used by the logs view to hand back compressed data payloads as JSON text.
+    conn.create_function("log_data", 1, partial(_data_text, conn, str(path)), deterministic=True)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA wal_autocheckpoint = {int(current_app.config.get('SQLITE_WAL_AUTOCHECKPOINT', 1000))}")
+    return conn
+
+
+def _begin_write(conn: sqlite3.Connection) -> None:
+    """Take the write lock up front so read-then-write transactions wait instead of failing."""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
 
 def get_db() -> sqlite3.Connection:
-    """Application DB: user/auth tables only."""
+    """Application DB: user/auth tables and the dataset registry."""
     if "db" not in g:
         db_path = Path(current_app.config["DATABASE"])
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        g.db = conn
+        g.db = _connect(db_path)
     return g.db
 
 
@@ -88,7 +123,53 @@ def _all_dataset_files() -> List[Path]:
     return sorted(dedup.values(), key=lambda p: str(p))
 
 
+# ISO-8601 utctime -> epoch milliseconds (NULL if unparseable). "Z"/offset suffixes are honoured;
+# naive timestamps are taken as UTC.
+_EPOCH_MS_SQL = "CAST(ROUND((julianday({}) - 2440587.5) * 86400000) AS INTEGER)"
+
+
+# Columns of logs held as ids into the per-dataset log_strings dictionary. channels
+# is its JSON text, so the order events list them in survives the round trip.
+ENCODED_FIELDS = (
+    "name",
+    "description",
+    "color",
+    "system",
+    "subsystem",
+    "unit",
+    "code",
+    "set_clear",
+    "channels",
+    "event_id",
+    "tags",
+)
+
+
+def _logs_is_view(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'logs'").fetchone()
+    return bool(row) and row["type"] == "view"
+
+
 def _migrate_logs_schema(conn: sqlite3.Connection) -> None:
+    # AUTOINCREMENT, so an id is never reused for different bytes within a file.
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'data_dictionaries'").fetchone()
+    if row is None or "AUTOINCREMENT" not in row["sql"]:
+        conn.execute(
+            """
+            CREATE TABLE data_dictionaries_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                zdict BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """
+        )
+        if row is not None:
+            conn.execute("INSERT INTO data_dictionaries_new SELECT id, zdict, created_at FROM data_dictionaries")
+            conn.execute("DROP TABLE data_dictionaries")
+        conn.execute("ALTER TABLE data_dictionaries_new RENAME TO data_dictionaries")
+    if _logs_is_view(conn):
+        _create_logs_view(conn)
+        return
     info = conn.execute("PRAGMA table_info(logs)").fetchall()
     col_names = [row["name"] for row in info]
     needs_recreate = not info or "boot_id" not in col_names or "id" not in col_names
@@ -163,10 +244,94 @@ def _migrate_logs_schema(conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE logs_new RENAME TO logs")
 
     conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_boot_row ON logs(boot_id, row_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_boot ON logs(boot_id)")
+    # boot_id lookups use the (boot_id, row_id) index; a separate boot_id index only slows ingest.
+    conn.execute("DROP INDEX IF EXISTS idx_logs_boot")
+
+    # utctime as integer epoch milliseconds, so time windows and boot bounds never re-parse strings.
+    if "epoch_ms" not in [row["name"] for row in conn.execute("PRAGMA table_info(logs)")]:
+        conn.execute("ALTER TABLE logs ADD COLUMN epoch_ms INTEGER")
+        conn.execute(f"UPDATE logs SET epoch_ms = {_EPOCH_MS_SQL.format('utctime')}")
+    _convert_logs_to_v2(conn)
+
+
+def _convert_logs_to_v2(conn: sqlite3.Connection) -> None:
+    """Move the logs table into the compact log_rows layout, leaving a logs view.
+
+    Repeated strings become ids into log_strings and the duplicate
+    (boot_id, row_id) index goes away. Row ids are kept, so full-text rowids
+    still match. Reads keep using the logs view; writes go to log_rows.
+    """
+    conn.execute("CREATE TABLE log_strings (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE)")
+    conn.execute(
+        """
+        CREATE TABLE log_rows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            boot_id TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            name INTEGER,
+            description INTEGER,
+            color INTEGER,
+            system INTEGER,
+            subsystem INTEGER,
+            unit INTEGER,
+            code INTEGER,
+            set_clear INTEGER,
+            utctime TEXT,
+            epoch_ms INTEGER,
+            norm_time INTEGER,
+            a_time INTEGER,
+            b_time INTEGER,
+            c_time INTEGER,
+            d_time INTEGER,
+            channels INTEGER,
+            data TEXT,
+            event_id INTEGER,
+            tags INTEGER,
+            UNIQUE(boot_id, row_id)
+        )
+    """
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO log_strings (value) "
+        + " UNION ".join(f"SELECT {field} FROM logs WHERE {field} IS NOT NULL" for field in ENCODED_FIELDS)
+    )
+    encoded = ", ".join(f"(SELECT id FROM log_strings WHERE value = l.{field})" for field in ENCODED_FIELDS)
+    conn.execute(
+        f"""
+        INSERT INTO log_rows (
+            id, boot_id, row_id, utctime, epoch_ms, norm_time, a_time, b_time, c_time, d_time, data,
+            {", ".join(ENCODED_FIELDS)}
+        )
+        SELECT
+            id, boot_id, row_id, utctime, epoch_ms, norm_time, a_time, b_time, c_time, d_time, data,
+            {encoded}
+        FROM logs AS l
+        ORDER BY id
+    """
+    )
+    conn.execute("DROP TABLE logs")
+    _create_logs_view(conn)
+    conn.execute("CREATE INDEX idx_logs_boot_norm ON log_rows(boot_id, norm_time)")
+    conn.execute("CREATE INDEX idx_logs_boot_epoch ON log_rows(boot_id, epoch_ms)")
+
+
+def _create_logs_view(conn: sqlite3.Connection) -> None:
+    decoded = ", ".join(
+        f"(SELECT value FROM log_strings WHERE id = r.{field}) AS {field}" for field in ENCODED_FIELDS
+    )
+    conn.execute("DROP VIEW IF EXISTS logs")
+    conn.execute(
+        f"""
+        CREATE VIEW logs AS
+        SELECT
+            id, boot_id, row_id, utctime, epoch_ms, norm_time, a_time, b_time, c_time, d_time,
+            log_data(r.data) AS data, {decoded}
+        FROM log_rows AS r
+    """
+    )
 
 
-def _init_dataset_db_schema(conn: sqlite3.Connection) -> None:
+def _init_dataset_db_schema(conn: sqlite3.Connection, path: Path) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS dataset_info (
@@ -177,10 +342,15 @@ def _init_dataset_db_schema(conn: sqlite3.Connection) -> None:
             owner_user_id INTEGER,
             log_count INTEGER NOT NULL DEFAULT 0,
             created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL
+            updated_at TEXT NOT NULL,
+            generation INTEGER NOT NULL DEFAULT 1
         )
     """
     )
+    # Bumped whenever what the dataset's pages show changes (boots, boot
+    # metadata, dataset info); part of the ETags the app sends.
+    if "generation" not in _table_columns(conn, "dataset_info"):
+        conn.execute("ALTER TABLE dataset_info ADD COLUMN generation INTEGER NOT NULL DEFAULT 1")
     _migrate_logs_schema(conn)
     conn.execute(
         """
@@ -188,13 +358,32 @@ def _init_dataset_db_schema(conn: sqlite3.Connection) -> None:
             boot_id TEXT PRIMARY KEY,
             created_at TEXT NOT NULL,
             event_count INTEGER NOT NULL,
-            mode TEXT NOT NULL DEFAULT 'production'
+            mode TEXT NOT NULL DEFAULT 'production',
+            version INTEGER NOT NULL DEFAULT 1,
+            system TEXT NOT NULL DEFAULT '',
+            event_id TEXT NOT NULL DEFAULT '',
+            tags TEXT NOT NULL DEFAULT '',
+            first_ms INTEGER,
+            last_ms INTEGER
         )
     """
     )
     boot_cols = [row["name"] for row in conn.execute("PRAGMA table_info(boots)")]
     if "mode" not in boot_cols:
         conn.execute("ALTER TABLE boots ADD COLUMN mode TEXT NOT NULL DEFAULT 'production'")
+    # Bumped whenever a boot's rows change, so per-process caches can tell they are stale.
+    if "version" not in boot_cols:
+        conn.execute("ALTER TABLE boots ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    # Boot summaries (the metadata every row shares, and the time span), so
+    # boot lists never touch the logs.
+    if "system" not in boot_cols:
+        for column in ("system", "event_id", "tags"):
+            conn.execute(f"ALTER TABLE boots ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        conn.execute("ALTER TABLE boots ADD COLUMN first_ms INTEGER")
+        conn.execute("ALTER TABLE boots ADD COLUMN last_ms INTEGER")
+        for row in conn.execute("SELECT boot_id FROM boots").fetchall():
+            _update_boot_summary(conn, row["boot_id"])
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_boots_summary ON boots(system, mode, event_id)")
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS log_index (
@@ -244,15 +433,112 @@ def _init_dataset_db_schema(conn: sqlite3.Connection) -> None:
         )
     """
     )
-    conn.commit()
+    if not _table_exists(conn, "boot_rollups"):
+        conn.execute(
+            """
+            CREATE TABLE boot_rollups (
+                boot_id TEXT NOT NULL,
+                resolution_ms INTEGER NOT NULL,
+                dimension TEXT NOT NULL,
+                bucket_ms INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (boot_id, resolution_ms, dimension, bucket_ms, value)
+            ) WITHOUT ROWID
+        """
+        )
+        for row in conn.execute("SELECT boot_id FROM boots").fetchall():
+            _build_boot_rollups(conn, row["boot_id"])
+    placeholders = ", ".join("?" * len(ROLLUP_RESOLUTIONS_MS))
+    conn.execute(f"DELETE FROM boot_rollups WHERE resolution_ms NOT IN ({placeholders})", ROLLUP_RESOLUTIONS_MS)
+    if not _table_exists(conn, search.KV_TABLE):
+        conn.execute(
+            f"""
+            CREATE TABLE {search.KV_TABLE} (
+                boot_id TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value_text TEXT,
+                value_num REAL
+            )
+        """
+        )
+        conn.execute(f"CREATE INDEX idx_log_kv_key ON {search.KV_TABLE}(key)")
+        conn.execute(f"CREATE INDEX idx_log_kv_path_text ON {search.KV_TABLE}(path, value_text)")
+        conn.execute(f"CREATE INDEX idx_log_kv_path_num ON {search.KV_TABLE}(path, value_num)")
+        _index_event_values(conn, path)
+    if not _table_exists(conn, search.TAGS_TABLE):
+        conn.execute(
+            f"""
+            CREATE TABLE {search.TAGS_TABLE} (
+                tag_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE
+            )
+        """
+        )
+        conn.execute(
+            f"""
+            CREATE TABLE {search.ROW_TAGS_TABLE} (
+                boot_id TEXT NOT NULL,
+                tag_id INTEGER NOT NULL,
+                row_id INTEGER NOT NULL,
+                PRIMARY KEY (boot_id, tag_id, row_id)
+            ) WITHOUT ROWID
+        """
+        )
+        for row in conn.execute("SELECT boot_id FROM boots").fetchall():
+            _index_row_tags(conn, row["boot_id"])
+    if current_app.config.get("SEARCH_FTS", True) and not _table_exists(conn, search.FTS_TABLE):
+        try:
+            conn.execute(
+                f"CREATE VIRTUAL TABLE {search.FTS_TABLE} USING fts5({', '.join(search.FTS_COLUMNS)}, tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 (or < 3.34): searches fall back to scanning.
+            pass
+        else:
+            _index_search_text(conn, path)
+
+
+# Bump whenever _init_dataset_db_schema changes; files below it are re-initialised once.
+DATASET_SCHEMA_VERSION = 14
+
+# Dataset files whose schema this process has already verified.
+_verified_dataset_schemas: set = set()
+_verified_dataset_schemas_lock = threading.Lock()
+
+
+def _ensure_dataset_schema(conn: sqlite3.Connection, path: Path) -> None:
+    """Run DDL/migrations at most once per file per process, and only if user_version is stale."""
+    key = str(path)
+    if key in _verified_dataset_schemas:
+        return
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < DATASET_SCHEMA_VERSION:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another connection may have migrated while we waited for the write lock.
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < DATASET_SCHEMA_VERSION:
+                _init_dataset_db_schema(conn, path)
+                conn.execute(f"PRAGMA user_version = {DATASET_SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    with _verified_dataset_schemas_lock:
+        _verified_dataset_schemas.add(key)
+
+
+def _forget_dataset_schema(path: Path) -> None:
+    with _verified_dataset_schemas_lock:
+        _verified_dataset_schemas.discard(str(path))
 
 
 def _read_dataset_info(path: Path) -> Optional[Dict[str, Any]]:
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    _init_dataset_db_schema(conn)
-    row = conn.execute("SELECT * FROM dataset_info WHERE singleton_id = 1").fetchone()
-    conn.close()
+    with _pooled_connection(path) as conn:
+        row = conn.execute("SELECT * FROM dataset_info WHERE singleton_id = 1").fetchone()
     if not row:
         return None
     return {
@@ -264,35 +550,226 @@ def _read_dataset_info(path: Path) -> Optional[Dict[str, Any]]:
         "log_count": int(row["log_count"] or 0),
         "created_at": row["created_at"],
         "updated_at": row["updated_at"],
+        "generation": int(row["generation"]),
     }
 
 
+# In-process dataset catalog: db path -> (file signature, dataset_info dict or None).
+_dataset_catalog: Dict[str, Tuple[Tuple[int, int, int, int], Optional[Dict[str, Any]]]] = {}
+_dataset_catalog_lock = threading.Lock()
+
+
+def _dataset_file_signature(path: Path) -> Optional[Tuple[int, int, int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    # Committed WAL frames only reach the main file at checkpoint time, so include the -wal file.
+    try:
+        wal = Path(f"{path}-wal").stat()
+        wal_sig = (wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        wal_sig = (0, 0)
+    return (stat.st_mtime_ns, stat.st_size) + wal_sig
+
+
+def invalidate_dataset_catalog(path: Optional[Path] = None) -> None:
+    """Drop cached dataset_info for one dataset file, or the whole catalog."""
+    with _dataset_catalog_lock:
+        if path is None:
+            _dataset_catalog.clear()
+        else:
+            _dataset_catalog.pop(str(path), None)
+
+
+def _cached_dataset_info(path: Path) -> Optional[Dict[str, Any]]:
+    """dataset_info for a file, re-read only when its mtime/size changed."""
+    key = str(path)
+    signature = _dataset_file_signature(path)
+    if signature is None:
+        invalidate_dataset_catalog(path)
+        return None
+    with _dataset_catalog_lock:
+        entry = _dataset_catalog.get(key)
+    if entry is None or entry[0] != signature:
+        meta = _read_dataset_info(path)
+        # Re-stat: opening the file may have touched it (schema init).
+        signature = _dataset_file_signature(path)
+        if signature is None:
+            return None
+        entry = (signature, meta)
+        with _dataset_catalog_lock:
+            _dataset_catalog[key] = entry
+    return dict(entry[1]) if entry[1] else None
+
+
 def _scan_datasets(user_id: Optional[int] = None, include_all: bool = False) -> List[Dict[str, Any]]:
     datasets = []
     files = _all_dataset_files() if include_all else _visible_dataset_files(user_id)
     for path in files:
-        meta = _read_dataset_info(path)
+        meta = _cached_dataset_info(path)
         if meta:
             datasets.append(meta)
     datasets.sort(key=lambda d: (d["name"].lower(), d["id"]))
     return datasets
 
 
-def _dataset_id_exists(dataset_id: int) -> bool:
-    if _dataset_path_for(dataset_id, None).exists():
-        return True
-    users_root = ensure_dataset_dir() / "users"
-    if users_root.exists():
-        return any(users_root.glob(f"*/dataset_{dataset_id}.db"))
-    return False
-
+def _allocate_dataset_id(name: str, owner_user_id: Optional[int], now: str) -> Tuple[int, Path]:
+    """Reserve a dataset id and path in the registry.
 
-def _next_dataset_id() -> int:
+    Ids keep the historical millisecond-timestamp seed but are bumped past the
+    largest registered id under BEGIN IMMEDIATE, so concurrent workers (threads
+    or processes) sharing the app DB never hand out the same id.
+    """
+    db = get_db()
     seed = int(datetime.utcnow().timestamp() * 1000)
-    candidate = seed
-    while _dataset_id_exists(candidate):
-        candidate += 1
-    return candidate
+    if db.in_transaction:
+        db.commit()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute("SELECT MAX(id) AS max_id FROM dataset_registry").fetchone()
+        dataset_id = max(seed, int(row["max_id"] or 0) + 1)
+        path = _dataset_path_for(dataset_id, owner_user_id)
+        db.execute(
+            """
+            INSERT INTO dataset_registry (id, owner_user_id, path, name, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            (dataset_id, owner_user_id, str(path), name, now, now),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return dataset_id, path
+
+
+def _register_dataset(dataset: Dict[str, Any], boot_count: Optional[int] = None) -> None:
+    db = get_db()
+    db.execute(
+        """
+        INSERT INTO dataset_registry (
+            id, owner_user_id, path, name, log_count, boot_count, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, COALESCE(?, 0), ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            owner_user_id = excluded.owner_user_id,
+            path = excluded.path,
+            name = excluded.name,
+            log_count = excluded.log_count,
+            boot_count = COALESCE(?, dataset_registry.boot_count),
+            updated_at = excluded.updated_at
+    """,
+        (
+            dataset["id"],
+            dataset.get("owner_user_id"),
+            dataset["db_path"],
+            dataset["name"],
+            dataset.get("log_count", 0),
+            boot_count,
+            dataset["created_at"],
+            dataset["updated_at"],
+            boot_count,
+        ),
+    )
+    db.commit()
+
+
+def _unregister_dataset(dataset_id: int) -> None:
+    db = get_db()
+    db.execute("DELETE FROM dataset_registry WHERE id = ?", (dataset_id,))
+    db.execute("DELETE FROM boot_catalog WHERE dataset_id = ?", (dataset_id,))
+    db.execute("DELETE FROM boot_catalog_tags WHERE dataset_id = ?", (dataset_id,))
+    db.commit()
+
+
+_BOOT_CATALOG_COLUMNS = (
+    "boot_id", "created_at", "event_count", "mode", "system", "event_id", "tags", "first_ms", "last_ms"
+)
+
+
+def _boot_catalog_rows(conn: sqlite3.Connection, dataset_id: int, boot_id: Optional[str] = None) -> List[Tuple]:
+    """boot_catalog rows for a dataset's boots (or just ``boot_id``), read from its boots table."""
+    sql = f"SELECT {', '.join(_BOOT_CATALOG_COLUMNS)} FROM boots"
+    params: Tuple = ()
+    if boot_id is not None:
+        sql += " WHERE boot_id = ?"
+        params = (boot_id,)
+    return [(dataset_id, *row) for row in conn.execute(sql, params)]
+
+
+def _catalog_boots(rows: List[Tuple], dataset_id: Optional[int] = None) -> None:
+    """Upsert boot_catalog rows and their tags; with ``dataset_id``, replace
+    that dataset's rows entirely."""
+    db = get_db()
+    if dataset_id is not None:
+        db.execute("DELETE FROM boot_catalog WHERE dataset_id = ?", (dataset_id,))
+        db.execute("DELETE FROM boot_catalog_tags WHERE dataset_id = ?", (dataset_id,))
+    db.executemany(
+        f"""
+        INSERT OR REPLACE INTO boot_catalog (dataset_id, {', '.join(_BOOT_CATALOG_COLUMNS)})
+        VALUES ({', '.join('?' * (len(_BOOT_CATALOG_COLUMNS) + 1))})
+    """,
+        rows,
+    )
+    tags_index = _BOOT_CATALOG_COLUMNS.index("tags") + 1
+    tag_ids: Dict[str, int] = {}
+    for row in rows:
+        if dataset_id is None:
+            db.execute("DELETE FROM boot_catalog_tags WHERE dataset_id = ? AND boot_id = ?", row[:2])
+        names = search.tag_names(row[tags_index])
+        db.executemany(
+            "INSERT OR IGNORE INTO boot_catalog_tags (tag_id, dataset_id, boot_id) VALUES (?, ?, ?)",
+            [(_tag_id(db, "catalog_tags", tag_ids, name), *row[:2]) for name in names],
+        )
+    db.commit()
+
+
+def rebuild_dataset_registry() -> int:
+    """Repopulate dataset_registry and boot_catalog from the dataset files on disk.
+    Returns the dataset count."""
+    entries = []
+    catalog: List[Tuple] = []
+    for path in _all_dataset_files():
+        meta = _cached_dataset_info(path)
+        if not meta:
+            continue
+        with _pooled_connection(path) as conn:
+            boot_rows = _boot_catalog_rows(conn, meta["id"])
+        boot_count = len(boot_rows)
+        catalog.extend(boot_rows)
+        entries.append(
+            (
+                meta["id"],
+                meta["owner_user_id"],
+                str(path),
+                meta["name"],
+                meta["log_count"],
+                boot_count,
+                meta["created_at"],
+                meta["updated_at"],
+            )
+        )
+    db = get_db()
+    if db.in_transaction:
+        db.commit()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM dataset_registry")
+        db.executemany(
+            """
+            INSERT OR REPLACE INTO dataset_registry (
+                id, owner_user_id, path, name, log_count, boot_count, created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            entries,
+        )
+        db.execute("DELETE FROM boot_catalog")
+        db.execute("DELETE FROM boot_catalog_tags")
+        _catalog_boots(catalog)
+    except Exception:
+        db.rollback()
+        raise
+    return len(entries)
 
 
 def _set_dataset_info(conn: sqlite3.Connection, dataset: Dict[str, Any]) -> None:
@@ -309,7 +786,8 @@ def _set_dataset_info(conn: sqlite3.Connection, dataset: Dict[str, Any]) -> None
             owner_user_id = excluded.owner_user_id,
             log_count = excluded.log_count,
             created_at = excluded.created_at,
-            updated_at = excluded.updated_at
+            updated_at = excluded.updated_at,
+            generation = dataset_info.generation + 1
     """,
         (
             dataset["id"],
@@ -323,17 +801,185 @@ def _set_dataset_info(conn: sqlite3.Connection, dataset: Dict[str, Any]) -> None
     )
 
 
-def get_dataset_db(dataset: Dict[str, Any], attach_app_db: bool = True) -> sqlite3.Connection:
-    """Open dataset DB and optionally ATTACH app DB for cross-db joins (e.g. users)."""
+def _checkpoint(conn: sqlite3.Connection, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+    """PRAGMA wal_checkpoint; returns (busy, wal_frames, checkpointed_frames)."""
+    row = conn.execute(f"PRAGMA main.wal_checkpoint({mode})").fetchone()
+    return (int(row[0]), int(row[1]), int(row[2]))
+
+
+def checkpoint_dataset(dataset: Dict[str, Any], mode: str = "TRUNCATE") -> Tuple[int, int, int]:
+    """Fold a dataset's WAL back into the main file (see docs/concurrency.rst)."""
+    if mode not in {"PASSIVE", "FULL", "RESTART", "TRUNCATE"}:
+        raise ValueError(f"invalid checkpoint mode: {mode}")
+    with dataset_connection(dataset) as conn:
+        result = _checkpoint(conn, mode)
+    invalidate_dataset_catalog(Path(dataset["db_path"]))
+    return result
+
+
+def _dataset_file_bytes(path: Path) -> int:
+    return sum(target.stat().st_size for target in (path, Path(f"{path}-wal")) if target.exists())
+
+
+def compact_dataset(dataset: Dict[str, Any], sample_rows: int = 20000, batch_size: int = 5000) -> Tuple[int, int]:
+    """Recompress every data payload with a dictionary trained on the whole
+    dataset, drop unused dictionaries and VACUUM the file.
+
+    Payloads are rewritten ``batch_size`` rows per write transaction, so
+    memory stays bounded and uploads can commit between batches; the VACUUM
+    at the end holds the write lock for the whole file. Run it in quiet
+    periods (see docs/concurrency.rst). Returns the file size (bytes) before
+    and after.
+    """
     path = Path(dataset["db_path"])
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    _init_dataset_db_schema(conn)
-    if attach_app_db:
-        app_db = str(Path(current_app.config["DATABASE"]))
-        conn.execute("ATTACH DATABASE ? AS app_db", (app_db,))
-    return conn
+    before = _dataset_file_bytes(path)
+    with dataset_connection(dataset) as conn:
+        dictionary_id = None
+        encode_data: Callable[[str], Any] = lambda text: text  # noqa: E731
+        if current_app.config.get("DATA_COMPRESSION", True):
+            _begin_write(conn)
+            total = conn.execute("SELECT COUNT(*) FROM log_rows").fetchone()[0]
+            step = max(1, total // sample_rows)
+            samples = [
+                row[0]
+                for row in conn.execute("SELECT log_data(data) FROM log_rows WHERE id % ? = 0", (step,))
+            ]
+            zdict = _train_data_dictionary(samples)
+            dictionary_id = _store_data_dictionary(conn, str(path), zdict, datetime.utcnow().isoformat())
+            encode_data = _data_encoder(dictionary_id, zdict)
+            conn.commit()
+        last_id = 0
+        while True:
+            _begin_write(conn)
+            rows = conn.execute(
+                "SELECT id, log_data(data) FROM log_rows WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                # Rows committed between batches got higher ids and were picked
+                # up above, so every payload now uses the new dictionary (or none).
+                conn.execute("DELETE FROM data_dictionaries WHERE id IS NOT ?", (dictionary_id,))
+                conn.commit()
+                break
+            conn.executemany(
+                "UPDATE log_rows SET data = ? WHERE id = ?",
+                ((encode_data(text) if text is not None else None, row_id) for row_id, text in rows),
+            )
+            conn.commit()
+            _checkpoint(conn, "PASSIVE")
+            last_id = rows[-1][0]
+        _boot_cache.invalidate(path)
+        _checkpoint(conn, "TRUNCATE")
+        conn.execute("VACUUM")
+        _checkpoint(conn, "TRUNCATE")
+    invalidate_dataset_catalog(path)
+    return before, _dataset_file_bytes(path)
+
+
+class _DatasetConnectionPool:
+    """Idle dataset connections keyed by (dataset path, app DB path).
+
+    A connection is only ever used by the thread that checked it out, so
+    connections are opened with check_same_thread=False and handed between
+    waitress threads through the pool. Idle connections are kept in LRU order;
+    the oldest are closed once max_idle is exceeded or they sit unused for
+    longer than idle_seconds.
+
+    Each checked-out connection remembers its file's generation, which
+    discard(path) bumps; a connection from an older generation is closed on
+    release instead of being pooled, however soon the path is reopened.
+    """
+
+    def __init__(self) -> None:
+        self._idle: "OrderedDict[int, Tuple[Tuple[str, str], sqlite3.Connection, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._checked_out: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, path: Path, app_db: str, idle_seconds: float) -> sqlite3.Connection:
+        key = (str(path), app_db)
+        with self._lock:
+            generation = self._generations.get(key[0], 0)
+            expired = self._evict_expired(idle_seconds)
+            conn = None
+            for conn_id in reversed(self._idle):
+                if self._idle[conn_id][0] == key:
+                    conn = self._idle.pop(conn_id)[1]
+                    self._checked_out[id(conn)] = generation
+                    break
+        for stale in expired:
+            stale.close()
+        if conn is not None:
+            return conn
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = _connect(path, check_same_thread=False)
+        try:
+            _ensure_dataset_schema(conn, path)
+            conn.execute("ATTACH DATABASE ? AS app_db", (app_db,))
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            self._checked_out[id(conn)] = generation
+        return conn
+
+    def release(self, path: Path, app_db: str, conn: sqlite3.Connection, max_idle: int) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        key = (str(path), app_db)
+        overflow = []
+        with self._lock:
+            if self._checked_out.pop(id(conn), None) != self._generations.get(key[0], 0):
+                overflow.append(conn)
+            else:
+                self._idle[id(conn)] = (key, conn, time.monotonic())
+                while len(self._idle) > max(0, max_idle):
+                    overflow.append(self._idle.popitem(last=False)[1][1])
+        for stale in overflow:
+            stale.close()
+
+    def discard(self, path: Optional[Path] = None) -> None:
+        """Close idle connections for one dataset file (or all); in-use ones close on release."""
+        closing = []
+        with self._lock:
+            if path is not None:
+                self._generations[str(path)] = self._generations.get(str(path), 0) + 1
+            for conn_id, (key, conn, _) in list(self._idle.items()):
+                if path is None or key[0] == str(path):
+                    closing.append(self._idle.pop(conn_id)[1])
+        for conn in closing:
+            conn.close()
+
+    def _evict_expired(self, idle_seconds: float) -> List[sqlite3.Connection]:
+        cutoff = time.monotonic() - idle_seconds
+        expired = []
+        while self._idle:
+            conn_id, (_, conn, released_at) = next(iter(self._idle.items()))
+            if released_at >= cutoff:
+                break
+            del self._idle[conn_id]
+            expired.append(conn)
+        return expired
+
+
+_dataset_pool = _DatasetConnectionPool()
+
+
+@contextmanager
+def _pooled_connection(path: Path) -> Iterator[sqlite3.Connection]:
+    """Check out a pooled connection to a dataset file with the app DB attached as app_db."""
+    app_db = str(Path(current_app.config["DATABASE"]))
+    conn = _dataset_pool.acquire(
+        path, app_db, float(current_app.config.get("DATASET_POOL_IDLE_SECONDS", 300))
+    )
+    try:
+        yield conn
+    finally:
+        _dataset_pool.release(path, app_db, conn, int(current_app.config.get("DATASET_POOL_MAX_IDLE", 32)))
+
+
+def dataset_connection(dataset: Dict[str, Any]) -> "ContextManager[sqlite3.Connection]":
+    """Pooled connection for a dataset; uncommitted work is rolled back on exit."""
+    return _pooled_connection(Path(dataset["db_path"]))
 
 
 def _migrate_legacy_app_db(db: sqlite3.Connection) -> None:
@@ -359,9 +1005,8 @@ def _migrate_legacy_app_db(db: sqlite3.Connection) -> None:
 
         dataset_path = _dataset_path_for(dataset_id, owner_user_id)
 
-        conn = sqlite3.connect(dataset_path)
-        conn.row_factory = sqlite3.Row
-        _init_dataset_db_schema(conn)
+        conn = _connect(dataset_path)
+        _ensure_dataset_schema(conn, dataset_path)
         marker = conn.execute(
             "SELECT value FROM migration_state WHERE key = 'legacy_app_db_import_v1'"
         ).fetchone()
@@ -491,7 +1136,26 @@ def _migrate_legacy_app_db(db: sqlite3.Connection) -> None:
         conn.close()
 
 
+# App DB paths already initialised/migrated by this process.
+_initialized_app_dbs: set = set()
+_init_db_lock = threading.Lock()
+
+
 def init_db() -> None:
+    """Create app tables and run the legacy migration. Safe to call repeatedly."""
+    with _init_db_lock:
+        _init_db()
+        _initialized_app_dbs.add(str(Path(current_app.config["DATABASE"])))
+
+
+def ensure_db_initialized() -> None:
+    """Per-request guard: a set lookup once the app DB has been bootstrapped."""
+    if str(Path(current_app.config["DATABASE"])) in _initialized_app_dbs:
+        return
+    init_db()
+
+
+def _init_db() -> None:
     db = get_db()
     db.execute(
         """
@@ -518,10 +1182,70 @@ def init_db() -> None:
         )
     """
     )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dataset_registry (
+            id INTEGER PRIMARY KEY,
+            owner_user_id INTEGER,
+            path TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            log_count INTEGER NOT NULL DEFAULT 0,
+            boot_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """
+    )
+    # Every boot of every dataset, copied from the per-dataset boots tables so
+    # cross-dataset boot lists need no dataset files opened.
+    catalog_missing = not _table_exists(db, "boot_catalog")
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS boot_catalog (
+            dataset_id INTEGER NOT NULL,
+            boot_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            event_count INTEGER NOT NULL,
+            mode TEXT NOT NULL,
+            system TEXT NOT NULL DEFAULT '',
+            event_id TEXT NOT NULL DEFAULT '',
+            tags TEXT NOT NULL DEFAULT '',
+            first_ms INTEGER,
+            last_ms INTEGER,
+            PRIMARY KEY (dataset_id, boot_id)
+        )
+    """
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS idx_boot_catalog_filter ON boot_catalog(system, mode, created_at)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_boot_catalog_event ON boot_catalog(event_id, created_at)")
+    # Boot tags, normalised, so tag filters are index lookups instead of LIKE scans.
+    catalog_missing = catalog_missing or not _table_exists(db, "boot_catalog_tags")
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalog_tags (
+            tag_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS boot_catalog_tags (
+            tag_id INTEGER NOT NULL,
+            dataset_id INTEGER NOT NULL,
+            boot_id TEXT NOT NULL,
+            PRIMARY KEY (tag_id, dataset_id, boot_id)
+        ) WITHOUT ROWID
+    """
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS idx_boot_catalog_tags_boot ON boot_catalog_tags(dataset_id, boot_id)")
     db.commit()
 
-    # Upgrade path from the old architecture. No new app-level dataset tables are created.
+    # Upgrade path from the old architecture. Dataset contents live in per-dataset files;
+    # the app DB only keeps the id -> path registry and the boot catalog.
     _migrate_legacy_app_db(db)
+    if catalog_missing or not db.execute("SELECT 1 FROM dataset_registry LIMIT 1").fetchone():
+        rebuild_dataset_registry()
 
 
 def _row_to_user(row: sqlite3.Row) -> Dict[str, Any]:
@@ -605,30 +1329,40 @@ def consume_login_token(token: str) -> Optional[int]:
 
 
 def get_dataset(dataset_id: int) -> Optional[Dict[str, Any]]:
+    row = get_db().execute("SELECT path FROM dataset_registry WHERE id = ?", (dataset_id,)).fetchone()
+    if row:
+        meta = _cached_dataset_info(Path(row["path"]))
+        if meta and int(meta["id"]) == dataset_id:
+            return meta
+
+    # Not registered (or the file moved): probe the filesystem once and repair the registry.
+    meta = _find_dataset_on_disk(dataset_id)
+    if meta:
+        _register_dataset(meta)
+        with _pooled_connection(Path(meta["db_path"])) as conn:
+            _catalog_boots(_boot_catalog_rows(conn, dataset_id), dataset_id)
+    elif row:
+        _unregister_dataset(dataset_id)
+    return meta
+
+
+def _find_dataset_on_disk(dataset_id: int) -> Optional[Dict[str, Any]]:
     public_path = _dataset_path_for(dataset_id, None)
     if public_path.exists():
-        meta = _read_dataset_info(public_path)
+        meta = _cached_dataset_info(public_path)
         if meta and int(meta["id"]) == dataset_id:
             return meta
 
-    current_user = getattr(g, "current_user", None) if g else None
-    if current_user and current_user.get("id") is not None:
-        user_path = _dataset_path_for(dataset_id, int(current_user["id"]))
-        if user_path.exists():
-            meta = _read_dataset_info(user_path)
-            if meta and int(meta["id"]) == dataset_id:
-                return meta
-
     users_root = ensure_dataset_dir() / "users"
     if users_root.exists():
         for path in users_root.glob(f"*/dataset_{dataset_id}.db"):
-            meta = _read_dataset_info(path)
+            meta = _cached_dataset_info(path)
             if meta and int(meta["id"]) == dataset_id:
                 return meta
 
     # Legacy flat-layout fallback.
     for path in ensure_dataset_dir().glob(f"dataset{dataset_id}_*.db"):
-        meta = _read_dataset_info(path)
+        meta = _cached_dataset_info(path)
         if meta and int(meta["id"]) == dataset_id:
             return meta
     return None
@@ -667,6 +1401,11 @@ def list_datasets(user_id: Optional[int] = None) -> List[Dict[str, Any]]:
     )
 
 
+def list_all_datasets() -> List[Dict[str, Any]]:
+    """Every dataset on disk regardless of owner (maintenance commands only)."""
+    return _scan_datasets(include_all=True)
+
+
 def get_first_dataset(user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
     datasets = list_datasets(user_id)
     return datasets[0] if datasets else None
@@ -674,8 +1413,7 @@ def get_first_dataset(user_id: Optional[int] = None) -> Optional[Dict[str, Any]]
 
 def create_dataset(name: str, description: str = "", owner_user_id: Optional[int] = None) -> Dict[str, Any]:
     now = datetime.utcnow().isoformat()
-    dataset_id = _next_dataset_id()
-    path = _dataset_path_for(dataset_id, owner_user_id)
+    dataset_id, path = _allocate_dataset_id(name, owner_user_id, now)
     dataset = {
         "id": dataset_id,
         "name": name,
@@ -686,10 +1424,10 @@ def create_dataset(name: str, description: str = "", owner_user_id: Optional[int
         "created_at": now,
         "updated_at": now,
     }
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    _set_dataset_info(conn, dataset)
-    conn.commit()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        _set_dataset_info(conn, dataset)
+        conn.commit()
+    invalidate_dataset_catalog(path)
     return dataset
 
 
@@ -697,133 +1435,530 @@ def delete_dataset(dataset_id: int) -> None:
     dataset = get_dataset(dataset_id)
     if not dataset:
         return
-    try:
-        path = Path(dataset["db_path"])
-        if path.exists():
-            path.unlink()
-    except OSError:
-        pass
+    _dataset_pool.discard(Path(dataset["db_path"]))
+    path = Path(dataset["db_path"])
+    for target in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        try:
+            if target.exists():
+                target.unlink()
+        except OSError:
+            pass
+    invalidate_dataset_catalog(Path(dataset["db_path"]))
+    _boot_cache.invalidate(Path(dataset["db_path"]))
+    with _log_strings_lock:
+        _log_strings.pop(str(path), None)
+    _forget_data_dictionaries(str(path))
+    _forget_dataset_schema(Path(dataset["db_path"]))
+    _unregister_dataset(dataset_id)
 
 
-def parse_events_from_upload(file_storage) -> List[Dict[str, Any]]:
-    raw = file_storage.read()
-    try:
-        payload = json.loads(raw)
-    except json.JSONDecodeError:
-        return []
-    events = []
-    if isinstance(payload, dict) and isinstance(payload.get("events"), list):
-        events = payload["events"]
-    elif isinstance(payload, list):
-        events = payload
-    cleaned = []
-    now = datetime.utcnow()
-    for idx, item in enumerate(events):
-        if not isinstance(item, dict):
-            continue
-        row_id = item.get("row_id") or idx + 1
-        utctime = item.get("utctime") or (now + timedelta(seconds=idx)).isoformat() + "Z"
-        norm_time = item.get("norm_time") or idx
-        channels = item.get("channels") or []
-        tags = item.get("tags") or item.get("labels") or []
-        event_id = item.get("event_id") or item.get("eventid")
-        cleaned.append(
-            {
-                "row_id": int(row_id),
-                "name": item.get("name", f"Event {row_id}"),
-                "description": item.get("description", ""),
-                "color": item.get("color", "Green"),
-                "system": item.get("system", "Unknown"),
-                "subsystem": item.get("subsystem", ""),
-                "unit": item.get("unit", ""),
-                "code": item.get("code", ""),
-                "set_clear": item.get("set_clear", "set"),
-                "utctime": utctime,
-                "norm_time": int(norm_time),
-                "a_time": item.get("a_time"),
-                "b_time": item.get("b_time"),
-                "c_time": item.get("c_time"),
-                "d_time": item.get("d_time"),
-                "channels": channels,
-                "data": item.get("data"),
-                "event_id": event_id or "",
-                "tags": tags,
-            }
-        )
-    return cleaned
+_UPLOAD_CHUNK_SIZE = 1 << 16
 
 
-def insert_events_into_dataset(
-    dataset: Dict[str, Any], events: List[Dict[str, Any]], mode: str = "production"
-) -> str:
-    import secrets
+class _JsonStream:
+    """Incremental JSON tokenizer over a binary stream, built on JSONDecoder.raw_decode.
 
-    if not events:
-        return ""
-    boot_id = secrets.token_urlsafe(8)
-    now_iso = datetime.utcnow().isoformat()
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    conn.executemany(
-        """
-        INSERT OR REPLACE INTO logs (
-            boot_id, row_id, name, description, color, system, subsystem, unit, code, set_clear,
-            utctime, norm_time, a_time, b_time, c_time, d_time, channels, data, event_id, tags
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """,
-        [
-            (
-                boot_id,
-                e["row_id"],
-                e["name"],
-                e["description"],
-                e["color"],
-                e["system"],
-                e["subsystem"],
-                e["unit"],
-                e["code"],
-                e["set_clear"],
-                e["utctime"],
-                e["norm_time"],
-                e["a_time"],
-                e["b_time"],
-                e["c_time"],
-                e["d_time"],
-                json.dumps(e["channels"]),
-                json.dumps(e["data"]),
-                e["event_id"],
-                ",".join(e["tags"]) if isinstance(e["tags"], list) else str(e["tags"] or ""),
-            )
-            for e in events
-        ],
-    )
+    Only the text of the value being decoded is buffered, so memory stays
+    bounded by the largest single event rather than the whole upload.
+    """
 
-    conn.execute(
-        "INSERT OR REPLACE INTO boots (boot_id, created_at, event_count, mode) VALUES (?, ?, ?, ?)",
-        (boot_id, now_iso, len(events), mode if mode in {"production", "test"} else "production"),
-    )
-    conn.executemany(
-        """
-        INSERT INTO log_index (boot_id, row_id, system, event_id, tags)
-        VALUES (?, ?, ?, ?, ?)
-    """,
-        [
-            (
-                boot_id,
-                e["row_id"],
-                e["system"],
-                e["event_id"],
-                ",".join(e["tags"]) if isinstance(e["tags"], list) else str(e["tags"] or ""),
+    def __init__(self, stream: Any, chunk_size: int = _UPLOAD_CHUNK_SIZE) -> None:
+        self._stream = stream
+        self._text = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self._json = json.JSONDecoder()
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # Grow reads with the pending text so one oversized value is not re-scanned per chunk.
+        chunk = self._stream.read(max(self._chunk_size, len(self.buf) - self.pos))
+        pending = self.buf[self.pos :]
+        if chunk:
+            self.buf = pending + self._text.decode(chunk)
+        else:
+            self.eof = True
+            self.buf = pending + self._text.decode(b"", final=True)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError("invalid_upload")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise ValueError("invalid_upload")
+                continue
+            # A number or literal ending at the buffer edge may continue in the next chunk.
+            if end >= len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json_array(reader: _JsonStream) -> Iterator[Any]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("]")
+        return
+
+
+def _iter_upload_items(stream: Any) -> Iterator[Any]:
+    """Top-level items of a JSON array, an {"events": [...]} object, or NDJSON."""
+    reader = _JsonStream(stream)
+    first = reader.peek()
+    if first == "[":
+        yield from _iter_json_array(reader)
+        return
+    if first != "{":
+        if first:
+            raise ValueError("invalid_upload")
+        return
+
+    # The first object is either the {"events": [...]} wrapper or the first NDJSON record.
+    reader.expect("{")
+    record: Dict[str, Any] = {}
+    wrapped = False
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError("invalid_upload")
+            reader.expect(":")
+            if key == "events" and reader.peek() == "[":
+                wrapped = True
+                yield from _iter_json_array(reader)
+            else:
+                record[key] = reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            break
+    # A lone object without an "events" array is a malformed wrapper, not a
+    # one-line NDJSON file: only treat it as a record when more records follow.
+    if wrapped or not reader.peek():
+        return
+    yield record
+    while reader.peek():
+        yield reader.value()
+
+
+def _clean_upload_event(item: Dict[str, Any], idx: int, now: datetime) -> Dict[str, Any]:
+    row_id = item.get("row_id") or idx + 1
+    utctime = item.get("utctime") or (now + timedelta(seconds=idx)).isoformat() + "Z"
+    norm_time = item.get("norm_time") or idx
+    channels = item.get("channels") or []
+    tags = item.get("tags") or item.get("labels") or []
+    event_id = item.get("event_id") or item.get("eventid")
+    return {
+        "row_id": int(row_id),
+        "name": item.get("name", f"Event {row_id}"),
+        "description": item.get("description", ""),
+        "color": item.get("color", "Green"),
+        "system": item.get("system", "Unknown"),
+        "subsystem": item.get("subsystem", ""),
+        "unit": item.get("unit", ""),
+        "code": item.get("code", ""),
+        "set_clear": item.get("set_clear", "set"),
+        "utctime": utctime,
+        "norm_time": int(norm_time),
+        "a_time": item.get("a_time"),
+        "b_time": item.get("b_time"),
+        "c_time": item.get("c_time"),
+        "d_time": item.get("d_time"),
+        "channels": channels,
+        "data": item.get("data"),
+        "event_id": event_id or "",
+        "tags": tags,
+    }
+
+
+def iter_events_from_upload(file_storage) -> Iterator[Dict[str, Any]]:
+    """Yield cleaned events from an upload without reading it into memory.
+
+    Accepts a top-level JSON array, an object with an "events" array, or
+    NDJSON (one event object per line, at least two lines). A lone object
+    without an "events" array yields nothing. Raises ValueError on malformed input.
+    """
+    now = datetime.utcnow()
+    stream = getattr(file_storage, "stream", file_storage)
+    for idx, item in enumerate(_iter_upload_items(stream)):
+        if isinstance(item, dict):
+            yield _clean_upload_event(item, idx, now)
+
+
+def stage_upload(file_storage) -> Path:
+    """Copy an upload to DATASET_ROOT/incoming so it outlives the request (for background ingest)."""
+    import secrets
+
+    incoming = ensure_dataset_dir() / "incoming"
+    incoming.mkdir(parents=True, exist_ok=True)
+    path = incoming / f"{secrets.token_hex(8)}.upload"
+    stream = getattr(file_storage, "stream", file_storage)
+    with open(path, "wb") as fh:
+        shutil.copyfileobj(stream, fh, _UPLOAD_CHUNK_SIZE)
+    return path
+
+
+def _batched(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# A compressed data payload is a BLOB: the 4-byte big-endian id of its preset
+# dictionary in the dataset's data_dictionaries, then a raw deflate stream.
+# Ids are only unique within a file, so cached dictionaries are keyed by
+# (dataset path, id). Payloads that would not shrink stay JSON TEXT.
+_DATA_DICTIONARY_BYTES = 32768
+_DATA_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+_data_dictionaries: Dict[Tuple[str, int], bytes] = {}
+_data_dictionaries_lock = threading.Lock()
+
+
+def _data_dictionary(path: str, dictionary_id: int, conn: Optional[sqlite3.Connection] = None) -> bytes:
+    zdict = _data_dictionaries.get((path, dictionary_id))
+    if zdict is None:
+        if conn is None:
+            raise KeyError(f"data dictionary {dictionary_id} of {path} is not loaded")
+        row = conn.execute("SELECT zdict FROM data_dictionaries WHERE id = ?", (dictionary_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"data dictionary {dictionary_id} of {path} is missing")
+        zdict = bytes(row[0])
+        # A write transaction may see its own uncommitted dictionary, whose id
+        # a rollback frees for other bytes; only committed ones are shared.
+        if not conn.in_transaction:
+            with _data_dictionaries_lock:
+                _data_dictionaries[(path, dictionary_id)] = zdict
+    return zdict
+
+
+def _load_data_dictionaries(conn: sqlite3.Connection, path: str) -> None:
+    """Cache every dictionary of a dataset, so its payloads inflate without a connection."""
+    for row in conn.execute("SELECT id FROM data_dictionaries").fetchall():
+        _data_dictionary(path, row[0], conn)
+
+
+def _forget_data_dictionaries(path: str) -> None:
+    with _data_dictionaries_lock:
+        for key in [key for key in _data_dictionaries if key[0] == path]:
+            del _data_dictionaries[key]
+
+
+def _inflate_data(blob: bytes, path: str, conn: Optional[sqlite3.Connection] = None) -> str:
+    return _inflate_with(blob, _data_dictionary(path, int.from_bytes(blob[:4], "big"), conn))
+
+
+def _inflate_with(blob: bytes, zdict: bytes) -> str:
+    inflater = zlib.decompressobj(-15, zdict=zdict)
+    return (inflater.decompress(blob[4:]) + inflater.flush()).decode()
+
+
+def _data_text(conn: sqlite3.Connection, path: str, value: Any) -> Any:
+    """Stored data payload as JSON text (the log_data() SQL function)."""
+    return _inflate_data(value, path, conn) if isinstance(value, bytes) else value
+
+
+def _train_data_dictionary(samples: Iterable[str]) -> bytes:
+    """Preset dictionary holding one example of each payload shape in ``samples``.
+
+    Payloads that differ only in their numbers share a shape. The most common
+    shapes go last, where deflate reaches them with the shortest distances.
+    """
+    counts: Dict[str, int] = {}
+    examples: Dict[str, str] = {}
+    for text in samples:
+        shape = _DATA_NUMBER_RE.sub("0", text)
+        counts[shape] = counts.get(shape, 0) + 1
+        examples.setdefault(shape, text)
+    parts: List[bytes] = []
+    size = 0
+    for shape in sorted(counts, key=counts.__getitem__, reverse=True):
+        example = examples[shape].encode()
+        if size + len(example) > _DATA_DICTIONARY_BYTES:
+            break
+        parts.append(example)
+        size += len(example)
+    return b"".join(reversed(parts))
+
+
+def _store_data_dictionary(conn: sqlite3.Connection, path: str, zdict: bytes, now: str) -> int:
+    """Id of ``zdict`` in the dataset's data_dictionaries, adding it if no row
+    holds these exact bytes. Must run inside the caller's write transaction."""
+    row = conn.execute("SELECT id FROM data_dictionaries WHERE zdict = ?", (zdict,)).fetchone()
+    if row is not None:
+        return row[0]
+    dictionary_id = conn.execute(
+        "INSERT INTO data_dictionaries (zdict, created_at) VALUES (?, ?)", (zdict, now)
+    ).lastrowid
+    # Files from before per-dataset ids kept crc32 ids, which sit anywhere in the 4-byte range.
+    if dictionary_id >= 1 << 32:
+        raise ValueError(f"{path} has run out of data dictionary ids")
+    return dictionary_id
+
+
+def _data_encoder(dictionary_id: int, zdict: bytes) -> Callable[[str], Any]:
+    prefix = dictionary_id.to_bytes(4, "big")
+
+    def encode(text: str) -> Any:
+        raw = text.encode()
+        deflater = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=zdict)
+        blob = prefix + deflater.compress(raw) + deflater.flush()
+        return blob if len(blob) < len(raw) else text
+
+    return encode
+
+
+def _string_id(conn: sqlite3.Connection, cache: Dict[str, int], value: Any) -> Optional[int]:
+    """Id of ``value`` in the dataset's log_strings dictionary, adding it if new.
+
+    Must run inside the caller's write transaction. ``cache`` remembers ids
+    already looked up in that transaction. None stays None, and any other
+    non-string value (e.g. a number in an uploaded name) is stored as its
+    text.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        value = str(value)
+    string_id = cache.get(value)
+    if string_id is None:
+        row = conn.execute("SELECT id FROM log_strings WHERE value = ?", (value,)).fetchone()
+        if row is None:
+            string_id = conn.execute("INSERT INTO log_strings (value) VALUES (?)", (value,)).lastrowid
+        else:
+            string_id = row["id"]
+        cache[value] = string_id
+    return string_id
+
+
+def _tags_to_str(tags: Any) -> str:
+    return ",".join(tags) if isinstance(tags, list) else str(tags or "")
+
+
+@contextmanager
+def _bulk_load_pragmas(conn: sqlite3.Connection) -> Iterator[None]:
+    """Loader settings for one ingest transaction; restored afterwards since the connection is pooled.
+
+    synchronous stays NORMAL: in WAL mode that already skips the fsync per
+    commit, and checkpoints (which copy earlier boots into the main file)
+    still sync.
+    """
+    previous_cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute(f"PRAGMA cache_size = {-int(current_app.config.get('INGEST_CACHE_SIZE_KB', 65536))}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    try:
+        yield
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute(f"PRAGMA cache_size = {previous_cache_size}")
+        conn.execute("PRAGMA temp_store = DEFAULT")
+
+
+def _ingest_data_encoder(
+    conn: sqlite3.Connection, path: str, first_batch: List[Dict[str, Any]], dumps: Callable[[Any], str], now: str
+) -> Callable[[str], Any]:
+    """How ingest stores data payloads: compressed with the dataset's newest
+    dictionary (trained from ``first_batch`` if it has none), or as plain
+    text when DATA_COMPRESSION is off."""
+    if not current_app.config.get("DATA_COMPRESSION", True):
+        return lambda text: text
+    row = conn.execute("SELECT id, zdict FROM data_dictionaries ORDER BY created_at DESC LIMIT 1").fetchone()
+    if row is not None:
+        return _data_encoder(row["id"], bytes(row["zdict"]))
+    zdict = _train_data_dictionary(dumps(e["data"]) for e in first_batch)
+    return _data_encoder(_store_data_dictionary(conn, path, zdict, now), zdict)
+
+
+def insert_events_into_dataset(
+    dataset: Dict[str, Any],
+    events: Iterable[Dict[str, Any]],
+    mode: str = "production",
+    batch_size: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> str:
+    """Bulk-load one boot from any iterable of cleaned events, batch_size rows at a time.
+
+    The whole boot is one transaction: if the iterable raises part way through,
+    nothing is kept. Only the logs table is written per batch; log_index is
+    filled from it in one set-based pass after the load, and log_count is
+    adjusted by the boot's row count instead of recounting the dataset.
+    If given, ``stats`` receives events, seconds and events_per_second, and
+    ``progress`` is called with the running row count after each batch.
+    """
+    import secrets
+
+    boot_id = secrets.token_urlsafe(8)
+    now_iso = datetime.utcnow().isoformat()
+    batch_size = batch_size or int(current_app.config.get("INGEST_BATCH_SIZE", 5000))
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    started = time.perf_counter()
+    loaded = 0
+    with dataset_connection(dataset) as conn, _bulk_load_pragmas(conn):
+        _begin_write(conn)
+        string_ids: Dict[str, int] = {}
+        seen_row_ids: set = set()
+        replaced: Dict[Any, Dict[str, Any]] = {}
+        encode_data: Optional[Callable[[str], Any]] = None
+        for batch in _batched(events, batch_size):
+            if encode_data is None:
+                encode_data = _ingest_data_encoder(conn, dataset["db_path"], batch, dumps, now_iso)
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO log_rows (
+                    boot_id, row_id, name, description, color, system, subsystem, unit, code, set_clear,
+                    utctime, norm_time, a_time, b_time, c_time, d_time, channels, data, event_id, tags,
+                    epoch_ms
+                ) VALUES (
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    {_EPOCH_MS_SQL.format("?11")}
+                )
+            """,
+                [
+                    (
+                        boot_id,
+                        e["row_id"],
+                        _string_id(conn, string_ids, e["name"]),
+                        _string_id(conn, string_ids, e["description"]),
+                        _string_id(conn, string_ids, e["color"]),
+                        _string_id(conn, string_ids, e["system"]),
+                        _string_id(conn, string_ids, e["subsystem"]),
+                        _string_id(conn, string_ids, e["unit"]),
+                        _string_id(conn, string_ids, e["code"]),
+                        _string_id(conn, string_ids, e["set_clear"]),
+                        e["utctime"],
+                        e["norm_time"],
+                        e["a_time"],
+                        e["b_time"],
+                        e["c_time"],
+                        e["d_time"],
+                        _string_id(conn, string_ids, dumps(e["channels"])),
+                        encode_data(dumps(e["data"])),
+                        _string_id(conn, string_ids, e["event_id"]),
+                        _string_id(conn, string_ids, _tags_to_str(e["tags"])),
+                    )
+                    for e in batch
+                ],
             )
-            for e in events
-        ],
-    )
-    total_logs = int(conn.execute("SELECT COUNT(*) AS c FROM logs").fetchone()["c"])
-    conn.execute(
-        "UPDATE dataset_info SET log_count = ?, updated_at = ? WHERE singleton_id = 1",
-        (total_logs, now_iso),
+            _insert_event_values(conn, boot_id, batch)
+            for e in batch:
+                if e["row_id"] in seen_row_ids:
+                    replaced[e["row_id"]] = e
+                seen_row_ids.add(e["row_id"])
+            loaded += len(batch)
+            if progress is not None:
+                progress(loaded)
+        if replaced:
+            # log_kv has no (boot_id, row_id) key to replace on, so drop the
+            # values of replaced rows and index only their final version.
+            conn.execute(
+                "DELETE FROM log_kv WHERE boot_id = ? AND row_id IN (SELECT value FROM json_each(?))",
+                (boot_id, json.dumps(list(replaced))),
+            )
+            _insert_event_values(conn, boot_id, replaced.values())
+        # Duplicate row_ids collapse under INSERT OR REPLACE, so count what actually landed.
+        event_count = int(
+            conn.execute("SELECT COUNT(*) AS c FROM log_rows WHERE boot_id = ?", (boot_id,)).fetchone()["c"]
+        )
+        if not event_count:
+            conn.rollback()
+            return ""
+
+        conn.execute(
+            """
+            INSERT INTO log_index (boot_id, row_id, system, event_id, tags)
+            SELECT r.boot_id, r.row_id, s.value, e.value, t.value
+            FROM log_rows AS r
+            LEFT JOIN log_strings AS s ON s.id = r.system
+            LEFT JOIN log_strings AS e ON e.id = r.event_id
+            LEFT JOIN log_strings AS t ON t.id = r.tags
+            WHERE r.boot_id = ? ORDER BY r.row_id
+        """,
+            (boot_id,),
+        )
+        if _table_exists(conn, search.FTS_TABLE):
+            _index_search_text(conn, Path(dataset["db_path"]), boot_id)
+        _index_row_tags(conn, boot_id)
+        _build_boot_rollups(conn, boot_id)
+        conn.execute(
+            """
+            INSERT INTO boots (boot_id, created_at, event_count, mode) VALUES (?, ?, ?, ?)
+            ON CONFLICT(boot_id) DO UPDATE SET
+                created_at = excluded.created_at,
+                event_count = excluded.event_count,
+                mode = excluded.mode,
+                version = boots.version + 1
+        """,
+            (boot_id, now_iso, event_count, mode if mode in {"production", "test"} else "production"),
+        )
+        _update_boot_summary(conn, boot_id)
+        conn.execute(
+            """
+            UPDATE dataset_info SET log_count = log_count + ?, updated_at = ?, generation = generation + 1
+            WHERE singleton_id = 1
+        """,
+            (event_count, now_iso),
+        )
+        info = conn.execute("SELECT log_count FROM dataset_info WHERE singleton_id = 1").fetchone()
+        total_logs = int(info["log_count"]) if info else event_count
+        boot_count = int(conn.execute("SELECT COUNT(*) AS c FROM boots").fetchone()["c"])
+        catalog_rows = _boot_catalog_rows(conn, dataset["id"], boot_id)
+        conn.commit()
+        _checkpoint(conn, "PASSIVE")
+    elapsed = time.perf_counter() - started
+    rate = event_count / elapsed if elapsed > 0 else float(event_count)
+    current_app.logger.info(
+        "Ingested %d events into dataset %s boot %s in %.2fs (%.0f events/s)",
+        event_count,
+        dataset["id"],
+        boot_id,
+        elapsed,
+        rate,
     )
-    conn.commit()
-    conn.close()
+    if stats is not None:
+        stats.update({"events": event_count, "seconds": elapsed, "events_per_second": rate})
+    invalidate_dataset_catalog(Path(dataset["db_path"]))
+    _boot_cache.invalidate(Path(dataset["db_path"]), boot_id)
+    _register_dataset(dict(dataset, log_count=total_logs, updated_at=now_iso), boot_count)
+    _catalog_boots(catalog_rows)
     return boot_id
 
 
@@ -838,11 +1973,10 @@ def list_boots_for_dataset(dataset_id: int) -> List[Dict[str, Any]]:
     dataset = get_dataset(dataset_id)
     if not dataset:
         return []
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    rows = conn.execute(
-        "SELECT boot_id, created_at, event_count, mode FROM boots ORDER BY datetime(created_at) DESC"
-    ).fetchall()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        rows = conn.execute(
+            "SELECT boot_id, created_at, event_count, mode FROM boots ORDER BY datetime(created_at) DESC"
+        ).fetchall()
     return [
         {
             "boot_id": r["boot_id"],
@@ -854,76 +1988,602 @@ def list_boots_for_dataset(dataset_id: int) -> List[Dict[str, Any]]:
     ]
 
 
+def _update_boot_summary(conn: sqlite3.Connection, boot_id: str) -> None:
+    """Copy a boot's shared metadata (from its first row) and time span onto its boots row."""
+    conn.execute(
+        """
+        UPDATE boots SET
+            (system, event_id, tags) = (
+                SELECT trim(coalesce(system, '')), trim(coalesce(event_id, '')), coalesce(tags, '')
+                FROM logs WHERE boot_id = boots.boot_id ORDER BY row_id LIMIT 1
+            ),
+            first_ms = (SELECT MIN(epoch_ms) FROM log_rows WHERE boot_id = boots.boot_id),
+            last_ms = (SELECT MAX(epoch_ms) FROM log_rows WHERE boot_id = boots.boot_id)
+        WHERE boot_id = ?
+    """,
+        (boot_id,),
+    )
+
+
+def list_catalog_boots(
+    user_id: Optional[int],
+    dataset_id: Optional[int] = None,
+    system: Optional[str] = None,
+    mode: Optional[str] = None,
+    tag: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Boots of every dataset visible to ``user_id`` (or just ``dataset_id``),
+    from the app DB's boot_catalog, grouped by event name.
+
+    ``boots`` is ordered by group (event_id, "Uncategorized" when blank,
+    case-insensitively) and newest first within a group; each carries its
+    ``event_name`` and ``dataset_name``. ``tag`` matches one of a boot's tags
+    exactly, ASCII case-insensitively. ``systems`` and ``tags`` list every
+    system and tag in scope, regardless of the filters.
+    """
+    scope = "(r.owner_user_id IS NULL OR r.owner_user_id = ?)"
+    scope_params: List[Any] = [user_id]
+    if dataset_id is not None:
+        scope += " AND r.id = ?"
+        scope_params.append(dataset_id)
+    conditions = [scope]
+    params = list(scope_params)
+    if system:
+        conditions.append("c.system = ?")
+        params.append(system)
+    if mode:
+        conditions.append("c.mode = ?")
+        params.append(mode)
+    if tag:
+        conditions.append(
+            """(c.dataset_id, c.boot_id) IN (
+                SELECT dataset_id, boot_id FROM boot_catalog_tags
+                WHERE tag_id = (SELECT tag_id FROM catalog_tags WHERE name = ?)
+            )"""
+        )
+        params.append(search.normalize_tag(tag))
+    db = get_db()
+    rows = db.execute(
+        f"""
+        SELECT c.*, r.name AS dataset_name, coalesce(nullif(c.event_id, ''), 'Uncategorized') AS event_name
+        FROM boot_catalog c
+        JOIN dataset_registry r ON r.id = c.dataset_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY lower(event_name), event_name, c.created_at DESC
+    """,
+        params,
+    ).fetchall()
+    systems = db.execute(
+        f"""
+        SELECT DISTINCT c.system FROM boot_catalog c
+        JOIN dataset_registry r ON r.id = c.dataset_id
+        WHERE {scope} AND c.system != ''
+    """,
+        scope_params,
+    ).fetchall()
+    tags = db.execute(
+        f"""
+        SELECT DISTINCT t.name FROM boot_catalog_tags c
+        JOIN catalog_tags t ON t.tag_id = c.tag_id
+        JOIN dataset_registry r ON r.id = c.dataset_id
+        WHERE {scope}
+    """,
+        scope_params,
+    ).fetchall()
+    return {
+        "boots": [dict(row) for row in rows],
+        "systems": sorted((row[0] for row in systems), key=str.lower),
+        "tags": sorted((row[0] for row in tags), key=str.lower),
+    }
+
+
 def get_latest_boot_id_for_dataset(dataset_id: int) -> Optional[str]:
     dataset = get_dataset(dataset_id)
     if not dataset:
         return None
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    boot_id = _latest_boot_id(conn)
-    conn.close()
-    return boot_id
+    with dataset_connection(dataset) as conn:
+        return _latest_boot_id(conn)
+
+
+EVENT_FIELDS = (
+    "row_id",
+    "name",
+    "description",
+    "color",
+    "system",
+    "subsystem",
+    "unit",
+    "code",
+    "set_clear",
+    "utctime",
+    "norm_time",
+    "a_time",
+    "b_time",
+    "c_time",
+    "d_time",
+    "channels",
+    "data",
+    "event_id",
+    "tags",
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_channels(text: Optional[str]) -> Tuple[Any, ...]:
+    return tuple(json.loads(text or "[]"))
+
+
+# Turn the stored text of these columns into event values; channels repeat
+# heavily, so their parses are shared.
+_EVENT_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "channels": lambda value: list(_parse_channels(value)),
+    "data": lambda value: json.loads(value or "null"),
+    "tags": search.split_tags,
+}
+
+
+def _stored_event_decoders(path: str) -> Dict[str, Callable[[Any], Any]]:
+    """_EVENT_DECODERS for values as _iter_log_rows yields them, where data
+    may still be a compressed payload of the dataset at ``path``."""
+
+    def decode_data(value: Any) -> Any:
+        return json.loads(_inflate_data(value, path) if isinstance(value, bytes) else value or "null")
+
+    return dict(_EVENT_DECODERS, data=decode_data)
+
+
+def _row_to_event(row: sqlite3.Row, fields: Iterable[str] = EVENT_FIELDS) -> Dict[str, Any]:
+    event: Dict[str, Any] = {}
+    for field in fields:
+        decode = _EVENT_DECODERS.get(field)
+        event[field] = decode(row[field]) if decode else row[field]
+    return event
+
+
+def _values_to_event(
+    fields: List[str], values: List[Any], decoders: Dict[str, Callable[[Any], Any]]
+) -> Dict[str, Any]:
+    """_row_to_event for a row from _iter_log_rows, given its _stored_event_decoders."""
+    event = dict(zip(fields, values))
+    for field, decode in decoders.items():
+        if field in event:
+            event[field] = decode(event[field])
+    return event
+
+
+# id -> value of each dataset's log_strings, per file. Ids are never reused
+# or changed, so a table only ever needs the ids added since it was read.
+_log_strings: Dict[str, Dict[int, str]] = {}
+_log_strings_lock = threading.Lock()
+
+
+def _log_string_table(conn: sqlite3.Connection, path: Path, missing: Optional[int] = None) -> Dict[int, str]:
+    key = str(path)
+    with _log_strings_lock:
+        table = _log_strings.setdefault(key, {})
+        if missing is None and table:
+            return table
+        if missing is not None and missing in table:
+            return table
+        start = max(table, default=0)
+        table.update(
+            (row[0], row[1]) for row in conn.execute("SELECT id, value FROM log_strings WHERE id > ?", (start,))
+        )
+        return table
+
+
+def _iter_log_rows(
+    conn: sqlite3.Connection,
+    path: Path,
+    columns: List[str],
+    where: str,
+    params: Iterable[Any],
+    batch_size: int = 1000,
+) -> Iterator[List[Any]]:
+    """``SELECT columns FROM logs WHERE where`` as lists, reading log_rows directly.
+
+    Dictionary ids are looked up in a per-process copy of log_strings
+    instead of the logs view's per-row subqueries, and every occurrence of a
+    string is the same object. Compressed data payloads are left as bytes
+    for _stored_event_decoders to inflate. ``where`` may end in ORDER BY / LIMIT.
+    Rows are fetched ``batch_size`` at a time off a single cursor.
+
+    Inside a write transaction, strings and data dictionaries may be
+    uncommitted, and a rollback frees their ids for other values. There the
+    strings the rows refer to are loaded privately, data payloads are
+    inflated before they are yielded, and the shared caches are left alone.
+    """
+    params = tuple(params)
+    encoded = [index for index, column in enumerate(columns) if column in ENCODED_FIELDS]
+    inflate: Optional[Callable[[bytes], str]] = None
+    pending = conn.in_transaction
+    if pending:
+        referenced = " UNION ".join(
+            f"SELECT * FROM (SELECT {columns[index]} FROM log_rows WHERE {where})" for index in encoded
+        )
+        strings = (
+            dict(conn.execute(f"SELECT id, value FROM log_strings WHERE id IN ({referenced})", params * len(encoded)))
+            if encoded
+            else {}
+        )
+        if "data" in columns:
+            zdicts = {row[0]: bytes(row[1]) for row in conn.execute("SELECT id, zdict FROM data_dictionaries")}
+            inflate = lambda blob: _inflate_with(blob, zdicts[int.from_bytes(blob[:4], "big")])  # noqa: E731
+    else:
+        strings = _log_string_table(conn, path)
+        if "data" in columns:
+            _load_data_dictionaries(conn, str(path))
+    data_index = columns.index("data") if inflate is not None else None
+    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM log_rows WHERE {where}", params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                values = list(row)
+                for index in encoded:
+                    string_id = values[index]
+                    if string_id is not None:
+                        value = strings.get(string_id)
+                        if value is None and not pending:
+                            strings = _log_string_table(conn, path, missing=string_id)
+                            value = strings[string_id]
+                        values[index] = value
+                if data_index is not None and isinstance(values[data_index], bytes):
+                    values[data_index] = inflate(values[data_index])
+                yield values
+    finally:
+        cursor.close()
+
+
+_BOOT_CACHE_NUMERIC = ("row_id", "norm_time", "a_time", "b_time", "c_time", "d_time", "epoch_ms")
+
+
+class _ColumnarBoot:
+    """One boot's logs rows held column-wise, in row_id order.
+
+    Integer columns are packed into arrays when every value fits (lists
+    otherwise, e.g. NULL timestamps), repeated strings are interned, and
+    ``channels``/``data`` stay as stored (JSON text, or a compressed
+    payload) until an event is built.
+    """
+
+    def __init__(self, columns: Dict[str, Any], nbytes: int, version: int, path: str) -> None:
+        self.version = version
+        self.decoders = _stored_event_decoders(path)
+        self.columns = columns
+        self.row_ids = columns["row_id"]
+        self.nbytes = nbytes
+        epoch = [value for value in columns["epoch_ms"] if value is not None]
+        self.first_ms = min(epoch) if epoch else None
+        self.last_ms = max(epoch) if epoch else None
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[List[Any]], version: int, max_bytes: int, path: str
+    ) -> Optional["_ColumnarBoot"]:
+        """Build from ``epoch_ms, <EVENT_FIELDS>`` rows; None once it outgrows max_bytes."""
+        names = ("epoch_ms",) + EVENT_FIELDS
+        values: Dict[str, List[Any]] = {name: [] for name in names}
+        seen: set = set()
+        nbytes = 0
+        for row in rows:
+            for name, value in zip(names, row):
+                if isinstance(value, (str, bytes)):
+                    if name != "data":
+                        value = sys.intern(value)
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        nbytes += sys.getsizeof(value)
+                elif value is not None:
+                    nbytes += 32
+                values[name].append(value)
+            nbytes += 8 * len(names)
+            if nbytes > max_bytes:
+                return None
+        columns: Dict[str, Any] = {}
+        for name, column in values.items():
+            if name in _BOOT_CACHE_NUMERIC and all(type(v) is int for v in column):
+                try:
+                    columns[name] = array("q", column)
+                    continue
+                except OverflowError:
+                    pass
+            columns[name] = column
+        return cls(columns, nbytes, version, path)
+
+    def events_after(
+        self, after_row_id: Optional[int], limit: Optional[int], fields: Iterable[str] = EVENT_FIELDS
+    ) -> List[Dict[str, Any]]:
+        """Events with row_id > after_row_id, as _row_to_event would build them."""
+        start = 0 if after_row_id is None else bisect_right(self.row_ids, after_row_id)
+        stop = len(self) if limit is None else min(len(self), start + limit)
+        fields = list(fields)
+        plain = [(field, self.columns[field]) for field in fields]
+        decoded = [
+            (field, self.columns[field], self.decoders[field]) for field in fields if field in self.decoders
+        ]
+        events = []
+        for index in range(start, stop):
+            event = {field: column[index] for field, column in plain}
+            for field, column, decode in decoded:
+                event[field] = decode(column[index])
+            events.append(event)
+        return events
 
 
-def load_log_data_from_dataset(dataset: Dict[str, Any], boot_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+class _BootCache:
+    """LRU of decoded boots keyed by (dataset path, boot_id), bounded by an estimated byte size.
+
+    Loads race invalidations through generation counters: a boot read
+    before an ingest or metadata update finished is not stored. Boots too
+    big to cache are remembered in a second LRU of at most max_oversized keys.
+    """
+
+    def __init__(self, max_oversized: int = 1024) -> None:
+        self._boots: "OrderedDict[Tuple[str, str], _ColumnarBoot]" = OrderedDict()
+        self._generations: Dict[Any, int] = {}
+        self._oversized: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._max_oversized = max_oversized
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def _generation(self, key: Tuple[str, str]) -> Tuple[int, int]:
+        return self._generations.get(key[0], 0), self._generations.get(key, 0)
+
+    def get(self, key: Tuple[str, str]) -> Tuple[Optional[_ColumnarBoot], Tuple[int, int], bool]:
+        """(cached boot or None, generation to pass to put, whether it is too big to cache)."""
+        with self._lock:
+            boot = self._boots.get(key)
+            if boot is not None:
+                self._boots.move_to_end(key)
+            oversized = key in self._oversized
+            if oversized:
+                self._oversized.move_to_end(key)
+            return boot, self._generation(key), oversized
+
+    def put(
+        self, key: Tuple[str, str], generation: Tuple[int, int], boot: Optional[_ColumnarBoot], max_bytes: int
+    ) -> None:
+        with self._lock:
+            if self._generation(key) != generation or key in self._boots:
+                return
+            if boot is None:
+                self._oversized[key] = None
+                while len(self._oversized) > self._max_oversized:
+                    self._oversized.popitem(last=False)
+                return
+            self._boots[key] = boot
+            self._nbytes += boot.nbytes
+            while self._nbytes > max_bytes and self._boots:
+                self._nbytes -= self._boots.popitem(last=False)[1].nbytes
+
+    def invalidate(self, path: Path, boot_id: Optional[str] = None) -> None:
+        """Forget one boot, or every boot of a dataset file."""
+        path_key = str(path)
+        with self._lock:
+            if boot_id is None:
+                keys = [key for key in list(self._boots) + list(self._oversized) if key[0] == path_key]
+                self._generations[path_key] = self._generations.get(path_key, 0) + 1
+            else:
+                keys = [(path_key, boot_id)]
+                self._generations[keys[0]] = self._generations.get(keys[0], 0) + 1
+            for key in keys:
+                boot = self._boots.pop(key, None)
+                if boot is not None:
+                    self._nbytes -= boot.nbytes
+                self._oversized.pop(key, None)
+
+
+_boot_cache = _BootCache()
+
+
+def _cached_boot(conn: sqlite3.Connection, dataset: Dict[str, Any], boot_id: str) -> Optional[_ColumnarBoot]:
+    """A boot from the in-process cache, loading it through ``conn`` on a miss.
+
+    A hit costs one primary-key lookup of boots.version, which catches edits
+    made by other processes. None when caching is disabled (BOOT_CACHE_BYTES
+    = 0), the boot does not exist, or it alone would exceed the budget;
+    callers then read from SQLite as usual.
+    """
+    max_bytes = int(current_app.config.get("BOOT_CACHE_BYTES", 0))
+    if max_bytes <= 0:
+        return None
+    row = conn.execute("SELECT version FROM boots WHERE boot_id = ?", (boot_id,)).fetchone()
+    if row is None:
+        return None
     path = Path(dataset["db_path"])
-    if not path.exists():
+    key = (str(path), boot_id)
+    boot, generation, oversized = _boot_cache.get(key)
+    if boot is not None and boot.version != row["version"]:
+        _boot_cache.invalidate(path, boot_id)
+        boot, generation, oversized = _boot_cache.get(key)
+    if boot is not None or oversized:
+        return boot
+    rows = _iter_log_rows(conn, path, ["epoch_ms", *EVENT_FIELDS], "boot_id = ? ORDER BY row_id", (boot_id,))
+    try:
+        boot = _ColumnarBoot.from_rows(rows, row["version"], max_bytes, str(path))
+    finally:
+        rows.close()
+    _boot_cache.put(key, generation, boot, max_bytes)
+    return boot
+
+
+def _index_search_text(conn: sqlite3.Connection, path: Path, boot_id: Optional[str] = None) -> None:
+    """Add logs rows (all, or one boot's) to the full-text search table."""
+    where, params = ("1", ()) if boot_id is None else ("boot_id = ?", (boot_id,))
+    fields = list(EVENT_FIELDS)
+    decoders = _stored_event_decoders(str(path))
+    columns = ", ".join(search.FTS_COLUMNS)
+    placeholders = ", ".join("?" for _ in search.FTS_COLUMNS)
+    conn.executemany(
+        f"INSERT INTO {search.FTS_TABLE} (rowid, {columns}) VALUES (?, {placeholders})",
+        (
+            (values[0], *search.fts_document(_values_to_event(fields, values[1:], decoders)))
+            for values in _iter_log_rows(conn, path, ["id", *fields], where, params)
+        ),
+    )
+
+
+_INSERT_EVENT_VALUES_SQL = f"""
+    INSERT INTO {search.KV_TABLE} (boot_id, row_id, path, key, value_text, value_num)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+# Bucket widths the histogram API offers: 1s, 10s, 1m, 5m, 1h.
+HISTOGRAM_RESOLUTIONS_MS = (1000, 10_000, 60_000, 300_000, 3_600_000)
+# The ones kept in boot_rollups. Seconds-wide buckets hold about one event
+# each, so those rollups would be as large as the rows they count; windows
+# narrow enough for them are counted straight off the (boot_id, epoch_ms) index.
+ROLLUP_RESOLUTIONS_MS = (60_000, 300_000, 3_600_000)
+ROLLUP_DIMENSIONS = ("color", "system", "code")
+
+
+def _build_boot_rollups(conn: sqlite3.Connection, boot_id: str) -> None:
+    """(Re)compute a boot's event counts per bucket for every resolution and dimension."""
+    conn.execute("DELETE FROM boot_rollups WHERE boot_id = ?", (boot_id,))
+    for resolution in ROLLUP_RESOLUTIONS_MS:
+        for dimension in ROLLUP_DIMENSIONS:
+            conn.execute(
+                f"""
+                INSERT INTO boot_rollups (boot_id, resolution_ms, dimension, bucket_ms, value, count)
+                SELECT ?1, ?2, ?3, g.bucket_ms, COALESCE(s.value, ''), SUM(g.count)
+                FROM (
+                    SELECT (epoch_ms / ?2) * ?2 AS bucket_ms, {dimension} AS string_id, COUNT(*) AS count
+                    FROM log_rows
+                    WHERE boot_id = ?1 AND epoch_ms IS NOT NULL
+                    GROUP BY 1, 2
+                ) AS g
+                LEFT JOIN log_strings AS s ON s.id = g.string_id
+                GROUP BY 4, 5
+            """,
+                (boot_id, resolution, dimension),
+            )
+
+
+def _insert_event_values(conn: sqlite3.Connection, boot_id: str, events: Iterable[Dict[str, Any]]) -> None:
+    conn.executemany(
+        _INSERT_EVENT_VALUES_SQL,
+        ((boot_id, e["row_id"], *entry) for e in events for entry in search.flatten_event(e)),
+    )
+
+
+def _index_event_values(conn: sqlite3.Connection, path: Path) -> None:
+    """Backfill the flattened key/value table from every logs row."""
+    fields = ["row_id", "channels", "data"]
+    decoders = _stored_event_decoders(str(path))
+    conn.executemany(
+        _INSERT_EVENT_VALUES_SQL,
+        (
+            (values[0], values[1], *entry)
+            for values in _iter_log_rows(conn, path, ["boot_id", *fields], "1", ())
+            for entry in search.flatten_event(_values_to_event(fields, values[1:], decoders))
+        ),
+    )
+
+
+def _tag_id(conn: sqlite3.Connection, table: str, tag_ids: Dict[str, int], name: str) -> int:
+    """tag_id of ``name`` in a (tag_id, name) table, inserting it if needed (memoized in ``tag_ids``)."""
+    tag_id = tag_ids.get(name)
+    if tag_id is None:
+        conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+        tag_id = conn.execute(f"SELECT tag_id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+        tag_ids[name] = tag_id
+    return tag_id
+
+
+def _index_row_tags(conn: sqlite3.Connection, boot_id: str) -> None:
+    """Rebuild a boot's row_tags entries from its logs rows."""
+    conn.execute(f"DELETE FROM {search.ROW_TAGS_TABLE} WHERE boot_id = ?", (boot_id,))
+    # A boot's rows share a handful of tags strings, so index per distinct string id.
+    tag_strings = conn.execute(
+        """
+        SELECT s.id, s.value FROM log_strings AS s
+        WHERE s.id IN (SELECT DISTINCT tags FROM log_rows WHERE boot_id = ?)
+    """,
+        (boot_id,),
+    ).fetchall()
+    tag_ids: Dict[str, int] = {}
+    for string_id, value in tag_strings:
+        for name in search.tag_names(value):
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO {search.ROW_TAGS_TABLE} (boot_id, tag_id, row_id)
+                SELECT boot_id, ?, row_id FROM log_rows WHERE boot_id = ? AND tags = ?
+            """,
+                (_tag_id(conn, search.TAGS_TABLE, tag_ids, name), boot_id, string_id),
+            )
+
+
+def _epoch_ms_to_datetime(value: Optional[int]) -> Optional[datetime]:
+    if value is None:
         return None
+    return datetime.utcfromtimestamp(value / 1000)
 
-    conn = get_dataset_db(dataset, attach_app_db=False)
+
+def _resolve_boot_id(conn: sqlite3.Connection, boot_id: Optional[str]) -> Optional[str]:
     target_boot = boot_id or _latest_boot_id(conn)
     if not target_boot:
-        row = conn.execute("SELECT boot_id FROM logs ORDER BY id DESC LIMIT 1").fetchone()
+        row = conn.execute("SELECT boot_id FROM log_rows ORDER BY id DESC LIMIT 1").fetchone()
         target_boot = row["boot_id"] if row else None
-    if not target_boot:
-        conn.close()
-        return None
+    return target_boot
 
-    rows = conn.execute("SELECT * FROM logs WHERE boot_id = ? ORDER BY row_id", (target_boot,)).fetchall()
-    conn.close()
 
-    events = []
-    start_ts = None
-    end_ts = None
-    for row in rows:
-        event_time = row["utctime"]
-        try:
-            parsed = datetime.fromisoformat(event_time.replace("Z", ""))
-        except Exception:
-            parsed = None
-        if parsed:
-            start_ts = parsed if start_ts is None else min(start_ts, parsed)
-            end_ts = parsed if end_ts is None else max(end_ts, parsed)
+def load_log_data_from_dataset(
+    dataset: Dict[str, Any], boot_id: Optional[str] = None, limit: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Boot payload for the viewer.
 
-        events.append(
-            {
-                "row_id": row["row_id"],
-                "name": row["name"],
-                "description": row["description"],
-                "color": row["color"],
-                "system": row["system"],
-                "subsystem": row["subsystem"],
-                "unit": row["unit"],
-                "code": row["code"],
-                "set_clear": row["set_clear"],
-                "utctime": row["utctime"],
-                "norm_time": row["norm_time"],
-                "a_time": row["a_time"],
-                "b_time": row["b_time"],
-                "c_time": row["c_time"],
-                "d_time": row["d_time"],
-                "channels": json.loads(row["channels"] or "[]"),
-                "data": json.loads(row["data"] or "null"),
-                "event_id": row["event_id"],
-                "tags": (row["tags"] or "").split(",") if row["tags"] else [],
-            }
-        )
+    With ``limit``, only the first page of events is included; ``next_after``
+    and ``events_url`` tell the client where to continue (see list_boot_events).
+    """
+    path = Path(dataset["db_path"])
+    if not path.exists():
+        return None
+
+    with dataset_connection(dataset) as conn:
+        target_boot = _resolve_boot_id(conn, boot_id)
+        if not target_boot:
+            return None
+
+        boot = _cached_boot(conn, dataset, target_boot)
+        if boot is not None:
+            events = boot.events_after(None, limit)
+            bounds = {"first": boot.first_ms, "last": boot.last_ms, "total": len(boot)}
+        else:
+            fields = list(EVENT_FIELDS)
+            where = "boot_id = ? ORDER BY row_id" + ("" if limit is None else " LIMIT ?")
+            params = (target_boot,) if limit is None else (target_boot, limit)
+            decoders = _stored_event_decoders(str(path))
+            events = [
+                _values_to_event(fields, values, decoders)
+                for values in _iter_log_rows(conn, path, fields, where, params)
+            ]
+            # Separate subqueries so each bound is a single seek on (boot_id, epoch_ms).
+            bounds = conn.execute(
+                """
+                SELECT
+                    (SELECT MIN(epoch_ms) FROM log_rows WHERE boot_id = ?1) AS first,
+                    (SELECT MAX(epoch_ms) FROM log_rows WHERE boot_id = ?1) AS last,
+                    (SELECT COUNT(*) FROM log_rows WHERE boot_id = ?1) AS total
+                """,
+                (target_boot,),
+            ).fetchone()
 
     if not events:
         return None
+    next_after = None
+    if limit is not None and bounds["total"] > len(events):
+        next_after = events[-1]["row_id"]
 
-    start_value = start_ts or datetime.utcnow()
-    end_value = end_ts or start_value
-    return {
+    start_value = _epoch_ms_to_datetime(bounds["first"]) or datetime.utcnow()
+    end_value = _epoch_ms_to_datetime(bounds["last"]) or start_value
+    payload = {
         "start": start_value.isoformat(timespec="seconds") + "Z",
         "end": end_value.isoformat(timespec="seconds") + "Z",
         "hours": (end_value - start_value).total_seconds() / 3600,
@@ -933,18 +2593,333 @@ def load_log_data_from_dataset(dataset: Dict[str, Any], boot_id: Optional[str] =
         "boot_id": target_boot,
         "dataset_id": dataset["id"],
     }
+    if limit is not None:
+        payload["total_events"] = int(bounds["total"])
+        payload["next_after"] = next_after
+    return payload
+
+
+def _select_event_fields(fields: Optional[List[str]]) -> List[str]:
+    if not fields:
+        return list(EVENT_FIELDS)
+    unknown = [f for f in fields if f not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown_fields: {', '.join(unknown)}")
+    return ["row_id"] + [f for f in EVENT_FIELDS if f in fields and f != "row_id"]
+
+
+def list_boot_events(
+    dataset: Dict[str, Any],
+    boot_id: str,
+    after_row_id: Optional[int] = None,
+    limit: int = 1000,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """One keyset page of a boot's events in row_id order.
+
+    Pages are read straight off the (boot_id, row_id) unique index, so the
+    cost of a page does not depend on how deep into the boot it is. Pass the
+    returned ``next_after`` back as ``after_row_id`` for the next page; it is
+    None on the last page. ``fields`` projects the event keys (row_id is
+    always included); unknown names raise ValueError.
+    """
+    selected = _select_event_fields(fields)
+    where = "boot_id = ?"
+    params: List[Any] = [boot_id]
+    if after_row_id is not None:
+        where += " AND row_id > ?"
+        params.append(after_row_id)
+    where += " ORDER BY row_id LIMIT ?"
+    params.append(limit + 1)
+    with dataset_connection(dataset) as conn:
+        boot = _cached_boot(conn, dataset, boot_id)
+        if boot is not None:
+            events = boot.events_after(after_row_id, limit + 1, selected)
+        else:
+            rows = _iter_log_rows(conn, Path(dataset["db_path"]), selected, where, params)
+            decoders = _stored_event_decoders(dataset["db_path"])
+            events = [_values_to_event(selected, values, decoders) for values in rows]
+    has_more = len(events) > limit
+    events = events[:limit]
+    return {
+        "events": events,
+        "next_after": events[-1]["row_id"] if has_more and events else None,
+    }
+
+
+def search_boot_events(
+    dataset: Dict[str, Any],
+    boot_id: str,
+    query: str,
+    after_row_id: Optional[int] = None,
+    limit: int = 1000,
+    tag: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Row ids of a boot's events matching a search query (and, if given,
+    tagged ``tag``), in row_id order.
+
+    Uses the query language of docs/search_syntax.rst. Conditions on plain
+    columns, term/contains conditions the dataset's full-text table can
+    answer, and data-path and key-name conditions the flattened key/value
+    table can answer are compiled into the SQL scan (see search.compile_sql); every row
+    that survives is then checked by the full evaluator, streaming, until
+    ``limit`` matches are found. Paginate with ``next_after`` as in
+    list_boot_events. ``tag`` is looked up in the row tag index, matching
+    tags exactly but ASCII case-insensitively. Syntax errors raise
+    ValueError.
+    """
+    ast = search.parse_query(query)
+    where = "boot_id = ?"
+    params: List[Any] = [boot_id]
+    if after_row_id is not None:
+        where += " AND row_id > ?"
+        params.append(after_row_id)
+    if tag:
+        condition = search.tag_condition(tag, boot_id)
+        where += f" AND {condition[0]}"
+        params.extend(condition[1])
+
+    row_ids: List[int] = []
+    has_more = False
+    fields = list(EVENT_FIELDS)
+    with dataset_connection(dataset) as conn:
+        pushdown = _search_pushdown(conn, ast, boot_id)
+        if pushdown is not None:
+            where += f" AND {pushdown[0]}"
+            params.extend(pushdown[1])
+        decoders = _stored_event_decoders(dataset["db_path"])
+        rows = _iter_log_rows(conn, Path(dataset["db_path"]), fields, where + " ORDER BY row_id", params)
+        try:
+            for values in rows:
+                event = _values_to_event(fields, values, decoders)
+                if not search.evaluate(ast, event):
+                    continue
+                if len(row_ids) == limit:
+                    has_more = True
+                    break
+                row_ids.append(event["row_id"])
+        finally:
+            rows.close()
+    return {"row_ids": row_ids, "next_after": row_ids[-1] if has_more and row_ids else None}
+
+
+def _search_pushdown(conn: sqlite3.Connection, ast: Any, boot_id: str) -> Optional[Tuple[str, List[Any]]]:
+    """search.compile_sql for a scan of one boot's log_rows."""
+    return search.compile_sql(
+        ast, fts=_table_exists(conn, search.FTS_TABLE), boot_id=boot_id, encoded=ENCODED_FIELDS
+    )
+
+
+def export_boot_events(
+    dataset: Dict[str, Any],
+    boot_id: str,
+    query: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    batch_size: int = 1000,
+) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """The exported field names, and a generator of all of a boot's events
+    (those matching ``query``, if given) in row_id order.
+
+    Rows are pulled off one cursor ``batch_size`` at a time, so memory does
+    not grow with the boot, and the boot cache is left alone. The pooled
+    connection (and its read snapshot) is held until the generator is
+    exhausted or closed. Bad fields and query syntax raise ValueError up
+    front.
+    """
+    selected = _select_event_fields(fields)
+    ast = search.parse_query(query) if query else None
+    return selected, _export_boot_events(dataset, boot_id, ast, selected, batch_size)
+
+
+def _export_boot_events(
+    dataset: Dict[str, Any], boot_id: str, ast: Optional[Any], selected: List[str], batch_size: int
+) -> Iterator[Dict[str, Any]]:
+    with dataset_connection(dataset) as conn:
+        where = "boot_id = ?"
+        params: List[Any] = [boot_id]
+        # Without a query only the selected columns are read; with one, the
+        # whole event is needed for search.evaluate.
+        fields = selected if ast is None else list(EVENT_FIELDS)
+        if ast is not None:
+            pushdown = _search_pushdown(conn, ast, boot_id)
+            if pushdown is not None:
+                where += f" AND {pushdown[0]}"
+                params.extend(pushdown[1])
+        decoders = _stored_event_decoders(dataset["db_path"])
+        rows = _iter_log_rows(conn, Path(dataset["db_path"]), fields, where + " ORDER BY row_id", params, batch_size)
+        # Close the cursor before the connection goes back to the pool, even
+        # when the consumer stops early.
+        try:
+            for values in rows:
+                event = _values_to_event(fields, values, decoders)
+                if ast is None:
+                    yield event
+                elif search.evaluate(ast, event):
+                    yield {field: event[field] for field in selected}
+        finally:
+            rows.close()
+
+
+WINDOW_KEYS = ("epoch_ms", "norm_time")
+
+
+def list_boot_events_in_window(
+    dataset: Dict[str, Any],
+    boot_id: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    by: str = "epoch_ms",
+    cursor: Optional[str] = None,
+    limit: int = 1000,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """One page of a boot's events whose ``by`` value lies in [start, end).
+
+    ``by`` is epoch_ms (utctime in epoch milliseconds) or norm_time. Either
+    bound may be None for an open end. Events come back in (by, id) order,
+    read off the matching (boot_id, by) index; pass ``next_cursor`` back as
+    ``cursor`` for the following page (None on the last page). Bad keys,
+    cursors or field names raise ValueError.
+    """
+    if by not in WINDOW_KEYS:
+        raise ValueError(f"invalid_window_key: {by}")
+    selected = _select_event_fields(fields)
+    where = f"boot_id = ? AND {by} IS NOT NULL"
+    params: List[Any] = [boot_id]
+    if start is not None:
+        where += f" AND {by} >= ?"
+        params.append(start)
+    if end is not None:
+        where += f" AND {by} < ?"
+        params.append(end)
+    if cursor:
+        try:
+            key_text, id_text = cursor.split(":", 1)
+            cursor_key, cursor_id = float(key_text), int(id_text)
+        except ValueError:
+            raise ValueError("invalid_cursor") from None
+        where += f" AND ({by} > ? OR ({by} = ? AND id > ?))"
+        params.extend([cursor_key, cursor_key, cursor_id])
+    where += f" ORDER BY {by}, id LIMIT ?"
+    params.append(limit + 1)
+    with dataset_connection(dataset) as conn:
+        rows = list(_iter_log_rows(conn, Path(dataset["db_path"]), ["id", by, *selected], where, params))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    decoders = _stored_event_decoders(dataset["db_path"])
+    return {
+        "events": [_values_to_event(selected, values[2:], decoders) for values in rows],
+        "next_cursor": f"{rows[-1][1]}:{rows[-1][0]}" if has_more and rows else None,
+    }
+
+
+def get_boot_histogram(
+    dataset: Dict[str, Any],
+    boot_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution_ms: Optional[int] = None,
+    dimension: str = "color",
+    max_buckets: int = 500,
+) -> Dict[str, Any]:
+    """Per-bucket event counts for a boot, read from its precomputed rollups.
+
+    ``start``/``end`` are epoch milliseconds and default to the boot's first
+    and last event. ``resolution_ms`` must be one of HISTOGRAM_RESOLUTIONS_MS;
+    when None the finest width giving at most ``max_buckets`` buckets is
+    picked, falling back to whole hours for very long boots. Buckets are
+    aligned to multiples of the width, and ``series`` maps each ``dimension``
+    value to a dense list of counts, one per bucket. Bad resolutions or
+    dimensions, and explicit resolutions needing more than ``max_buckets``
+    buckets, raise ValueError.
+    """
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"invalid_dimension: {dimension}")
+    if resolution_ms is not None and resolution_ms not in HISTOGRAM_RESOLUTIONS_MS:
+        raise ValueError(f"invalid_resolution: {resolution_ms}")
+    with dataset_connection(dataset) as conn:
+        if start is None or end is None:
+            bounds = conn.execute(
+                "SELECT MIN(epoch_ms) AS first_ms, MAX(epoch_ms) AS last_ms FROM log_rows WHERE boot_id = ?",
+                (boot_id,),
+            ).fetchone()
+            if start is None:
+                start = bounds["first_ms"]
+            if end is None and bounds["last_ms"] is not None:
+                end = bounds["last_ms"] + 1
+        if start is None or end is None or end <= start:
+            return {
+                "resolution_ms": resolution_ms,
+                "dimension": dimension,
+                "start_ms": None,
+                "buckets": 0,
+                "series": {},
+            }
+        span = end - start
+        if resolution_ms is None:
+            resolution_ms = next(
+                (r for r in HISTOGRAM_RESOLUTIONS_MS if span / r < max_buckets),
+                HISTOGRAM_RESOLUTIONS_MS[-1],
+            )
+            # Hourly rollups re-aggregated into wider buckets still read few rows.
+            width = resolution_ms * max(1, math.ceil(span / resolution_ms / max_buckets))
+        elif span / resolution_ms > max_buckets:
+            raise ValueError("too_many_buckets")
+        else:
+            width = resolution_ms
+        first_bucket = int(start // width) * width
+        bucket_count = math.ceil((end - first_bucket) / width)
+        if resolution_ms in ROLLUP_RESOLUTIONS_MS:
+            rows = conn.execute(
+                """
+                SELECT (bucket_ms - ?3) / ?4 AS slot, value, SUM(count) AS total
+                FROM boot_rollups
+                WHERE boot_id = ?1 AND resolution_ms = ?2 AND dimension = ?5
+                  AND bucket_ms >= ?3 AND bucket_ms < ?6
+                GROUP BY slot, value
+            """,
+                (boot_id, resolution_ms, first_bucket, width, dimension, end),
+            ).fetchall()
+        else:
+            # Count per string id, then decode once per group.
+            rows = conn.execute(
+                f"""
+                SELECT g.slot, COALESCE(s.value, '') AS value, SUM(g.total) AS total
+                FROM (
+                    SELECT (epoch_ms - ?2) / ?3 AS slot, {dimension} AS string_id, COUNT(*) AS total
+                    FROM log_rows
+                    WHERE boot_id = ?1 AND epoch_ms >= ?2 AND epoch_ms < ?4
+                    GROUP BY slot, string_id
+                ) AS g
+                LEFT JOIN log_strings AS s ON s.id = g.string_id
+                GROUP BY g.slot, 2
+            """,
+                (boot_id, first_bucket, width, first_bucket + bucket_count * width),
+            ).fetchall()
+    series: Dict[str, List[int]] = {}
+    for row in rows:
+        counts = series.get(row["value"])
+        if counts is None:
+            counts = series[row["value"]] = [0] * bucket_count
+        counts[row["slot"]] = row["total"]
+    return {
+        "resolution_ms": width,
+        "dimension": dimension,
+        "start_ms": first_bucket,
+        "buckets": bucket_count,
+        "series": series,
+    }
 
 
 def get_boot_meta(dataset_id: int, boot_id: str) -> Optional[Dict[str, Any]]:
     dataset = get_dataset(dataset_id)
     if not dataset:
         return None
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    row = conn.execute(
-        "SELECT boot_id, created_at, event_count, mode FROM boots WHERE boot_id = ?",
-        (boot_id,),
-    ).fetchone()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        row = conn.execute(
+            "SELECT boot_id, created_at, event_count, mode, version FROM boots WHERE boot_id = ?",
+            (boot_id,),
+        ).fetchone()
     if not row:
         return None
     return {
@@ -953,67 +2928,88 @@ def get_boot_meta(dataset_id: int, boot_id: str) -> Optional[Dict[str, Any]]:
         "created_at": row["created_at"],
         "event_count": int(row["event_count"]),
         "mode": row["mode"] or "production",
+        "version": int(row["version"]),
     }
 
 
 def get_boot_details(dataset: Dict[str, Any], boot_id: str) -> Dict[str, str]:
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    boot_row = conn.execute("SELECT mode FROM boots WHERE boot_id = ?", (boot_id,)).fetchone()
-    row = conn.execute(
-        "SELECT system, event_id, tags FROM logs WHERE boot_id = ? LIMIT 1",
-        (boot_id,),
-    ).fetchone()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        row = conn.execute("SELECT system, event_id, tags, mode FROM boots WHERE boot_id = ?", (boot_id,)).fetchone()
     return {
         "system": row["system"] if row else "",
         "event_id": row["event_id"] if row else "",
         "tags": row["tags"] if row else "",
-        "mode": (boot_row["mode"] if boot_row else "production") or "production",
+        "mode": (row["mode"] if row else "production") or "production",
     }
 
 
 def update_boot_metadata(
     dataset: Dict[str, Any], boot_id: str, system: str, event_id: str, tags: List[str], mode: str
 ) -> None:
+    # boots, log_rows and log_index all get the same normalised values.
+    system, event_id = system.strip(), event_id.strip()
     tags_str = ",".join(tags)
-    conn = get_dataset_db(dataset, attach_app_db=False)
     normalized_mode = mode if mode in {"production", "test"} else "production"
-    conn.execute("UPDATE boots SET mode = ? WHERE boot_id = ?", (normalized_mode, boot_id))
-    conn.execute(
-        "UPDATE logs SET system = ?, event_id = ?, tags = ? WHERE boot_id = ?",
-        (system, event_id, tags_str, boot_id),
-    )
-    rows = conn.execute(
-        "SELECT row_id, system, event_id, tags FROM logs WHERE boot_id = ?",
-        (boot_id,),
-    ).fetchall()
-    conn.execute("DELETE FROM log_index WHERE boot_id = ?", (boot_id,))
-    conn.executemany(
-        """
-        INSERT INTO log_index (boot_id, row_id, system, event_id, tags)
-        VALUES (?, ?, ?, ?, ?)
-    """,
-        [(boot_id, r["row_id"], r["system"], r["event_id"], r["tags"]) for r in rows],
-    )
-    conn.commit()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        _begin_write(conn)
+        conn.execute(
+            """
+            UPDATE boots SET mode = ?, system = ?, event_id = ?, tags = ?, version = version + 1
+            WHERE boot_id = ?
+        """,
+            (normalized_mode, system, event_id, tags_str, boot_id),
+        )
+        string_ids: Dict[str, int] = {}
+        conn.execute(
+            "UPDATE log_rows SET system = ?, event_id = ?, tags = ? WHERE boot_id = ?",
+            (
+                _string_id(conn, string_ids, system),
+                _string_id(conn, string_ids, event_id),
+                _string_id(conn, string_ids, tags_str),
+                boot_id,
+            ),
+        )
+        conn.execute("DELETE FROM log_index WHERE boot_id = ?", (boot_id,))
+        conn.execute(
+            """
+            INSERT INTO log_index (boot_id, row_id, system, event_id, tags)
+            SELECT boot_id, row_id, ?, ?, ? FROM log_rows WHERE boot_id = ? ORDER BY row_id
+        """,
+            (system, event_id, tags_str, boot_id),
+        )
+        if _table_exists(conn, search.FTS_TABLE):
+            conn.execute(
+                f"DELETE FROM {search.FTS_TABLE} WHERE rowid IN (SELECT id FROM log_rows WHERE boot_id = ?)",
+                (boot_id,),
+            )
+            _index_search_text(conn, Path(dataset["db_path"]), boot_id)
+        _index_row_tags(conn, boot_id)
+        _build_boot_rollups(conn, boot_id)
+        conn.execute(
+            "UPDATE dataset_info SET updated_at = ?, generation = generation + 1 WHERE singleton_id = 1",
+            (datetime.utcnow().isoformat(),),
+        )
+        catalog_rows = _boot_catalog_rows(conn, dataset["id"], boot_id)
+        conn.commit()
+    invalidate_dataset_catalog(Path(dataset["db_path"]))
+    _boot_cache.invalidate(Path(dataset["db_path"]), boot_id)
+    _catalog_boots(catalog_rows)
 
 
 def list_bookmarks_for_user(user_id: int, dataset_id: int, boot_id: str) -> Dict[str, int]:
     dataset = get_dataset(dataset_id)
     if not dataset:
         return {}
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    rows = conn.execute(
-        """
-        SELECT row_id, color_index
-        FROM bookmarks
-        WHERE user_id = ? AND boot_id = ?
-        ORDER BY row_id
-    """,
-        (user_id, boot_id),
-    ).fetchall()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        rows = conn.execute(
+            """
+            SELECT row_id, color_index
+            FROM bookmarks
+            WHERE user_id = ? AND boot_id = ?
+            ORDER BY row_id
+        """,
+            (user_id, boot_id),
+        ).fetchall()
     return {str(r["row_id"]): int(r["color_index"]) for r in rows}
 
 
@@ -1022,46 +3018,43 @@ def set_bookmark(user_id: int, dataset_id: int, boot_id: str, row_id: int, color
     if not dataset:
         return
     now = datetime.utcnow().isoformat()
-    conn = get_dataset_db(dataset, attach_app_db=False)
-    if color_index <= 0:
+    with dataset_connection(dataset) as conn:
+        if color_index <= 0:
+            conn.execute(
+                "DELETE FROM bookmarks WHERE user_id = ? AND boot_id = ? AND row_id = ?",
+                (user_id, boot_id, row_id),
+            )
+            conn.commit()
+            return
+
         conn.execute(
-            "DELETE FROM bookmarks WHERE user_id = ? AND boot_id = ? AND row_id = ?",
-            (user_id, boot_id, row_id),
+            """
+            INSERT INTO bookmarks (user_id, boot_id, row_id, color_index, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, boot_id, row_id)
+            DO UPDATE SET color_index = excluded.color_index, updated_at = excluded.updated_at
+        """,
+            (user_id, boot_id, row_id, color_index, now, now),
         )
         conn.commit()
-        conn.close()
-        return
-
-    conn.execute(
-        """
-        INSERT INTO bookmarks (user_id, boot_id, row_id, color_index, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ON CONFLICT(user_id, boot_id, row_id)
-        DO UPDATE SET color_index = excluded.color_index, updated_at = excluded.updated_at
-    """,
-        (user_id, boot_id, row_id, color_index, now, now),
-    )
-    conn.commit()
-    conn.close()
 
 
 def list_comments_for_boot(dataset_id: int, boot_id: str) -> List[Dict[str, Any]]:
     dataset = get_dataset(dataset_id)
     if not dataset:
         return []
-    conn = get_dataset_db(dataset, attach_app_db=True)
-    rows = conn.execute(
-        """
-        SELECT c.id, c.row_id, c.parent_id, c.body, c.created_at,
-               u.id AS user_id, u.name AS user_name, u.email AS user_email
-        FROM comments c
-        LEFT JOIN app_db.users u ON u.id = c.user_id
-        WHERE c.boot_id = ?
-        ORDER BY datetime(c.created_at) ASC, c.id ASC
-    """,
-        (boot_id,),
-    ).fetchall()
-    conn.close()
+    with dataset_connection(dataset) as conn:
+        rows = conn.execute(
+            """
+            SELECT c.id, c.row_id, c.parent_id, c.body, c.created_at,
+                   u.id AS user_id, u.name AS user_name, u.email AS user_email
+            FROM comments c
+            LEFT JOIN app_db.users u ON u.id = c.user_id
+            WHERE c.boot_id = ?
+            ORDER BY datetime(c.created_at) ASC, c.id ASC
+        """,
+            (boot_id,),
+        ).fetchall()
     return [
         {
             "id": r["id"],
@@ -1090,41 +3083,38 @@ def create_comment(
         raise ValueError("dataset_not_found")
 
     now = datetime.utcnow().isoformat()
-    conn = get_dataset_db(dataset, attach_app_db=True)
-
-    parent_valid = None
-    if parent_id is not None:
-        parent = conn.execute(
-            "SELECT id, row_id FROM comments WHERE id = ? AND boot_id = ?",
-            (parent_id, boot_id),
+    with dataset_connection(dataset) as conn:
+        _begin_write(conn)
+        parent_valid = None
+        if parent_id is not None:
+            parent = conn.execute(
+                "SELECT id, row_id FROM comments WHERE id = ? AND boot_id = ?",
+                (parent_id, boot_id),
+            ).fetchone()
+            if not parent:
+                raise ValueError("invalid_parent")
+            if int(parent["row_id"]) != int(row_id):
+                raise ValueError("parent_row_mismatch")
+            parent_valid = parent["id"]
+
+        cursor = conn.execute(
+            """
+            INSERT INTO comments (user_id, boot_id, row_id, parent_id, body, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            (user_id, boot_id, row_id, parent_valid, body, now),
+        )
+        row = conn.execute(
+            """
+            SELECT c.id, c.row_id, c.parent_id, c.body, c.created_at,
+                   u.id AS user_id, u.name AS user_name, u.email AS user_email
+            FROM comments c
+            LEFT JOIN app_db.users u ON u.id = c.user_id
+            WHERE c.id = ?
+        """,
+            (cursor.lastrowid,),
         ).fetchone()
-        if not parent:
-            conn.close()
-            raise ValueError("invalid_parent")
-        if int(parent["row_id"]) != int(row_id):
-            conn.close()
-            raise ValueError("parent_row_mismatch")
-        parent_valid = parent["id"]
-
-    cursor = conn.execute(
-        """
-        INSERT INTO comments (user_id, boot_id, row_id, parent_id, body, created_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """,
-        (user_id, boot_id, row_id, parent_valid, body, now),
-    )
-    row = conn.execute(
-        """
-        SELECT c.id, c.row_id, c.parent_id, c.body, c.created_at,
-               u.id AS user_id, u.name AS user_name, u.email AS user_email
-        FROM comments c
-        LEFT JOIN app_db.users u ON u.id = c.user_id
-        WHERE c.id = ?
-    """,
-        (cursor.lastrowid,),
-    ).fetchone()
-    conn.commit()
-    conn.close()
+        conn.commit()
 
     return {
         "id": row["id"],
@@ -72,6 +72,42 @@ LogApp.loadLogData = () => {
   }
 };
 
+LogApp.EVENTS_PAGE_SIZE = 5000;
+
+// The page only inlines the first events of a boot; page the rest in from the events API.
+LogApp.loadRemainingEvents = async (logData, bus, worker) => {
+  if (!logData?.events_url || logData.next_after == null) return;
+  const events = logData.events;
+  let after = logData.next_after;
+  while (after != null) {
+    let payload = null;
+    try {
+      const response = await fetch(
+        `${logData.events_url}?after=${encodeURIComponent(after)}&limit=${LogApp.EVENTS_PAGE_SIZE}&format=columnar`
+      );
+      if (!response.ok) return;
+      payload = await response.json();
+    } catch (err) {
+      return;
+    }
+    const page = payload?.columnar
+      ? LogApp.decodeColumnarEvents(payload.columnar)
+      : Array.isArray(payload?.events) ? payload.events : [];
+    if (!page.length) break;
+    for (const event of page) events.push(event);
+    // The worker decodes its own copy; columns are much cheaper to post than event objects.
+    if (worker) {
+      worker.postMessage(
+        payload.columnar ? { type: "append", columnar: payload.columnar } : { type: "append", events: page }
+      );
+    }
+    if (bus) bus.emit("events:appended", page);
+    after = payload.next_after;
+  }
+  logData.next_after = null;
+  if (bus) bus.emit("events:complete", events);
+};
+
 LogApp.smoothScrollTo = (container, targetTop, durationMs = 200, onComplete = null) => {
   const startTop = container.scrollTop;
   const delta = targetTop - startTop;
@@ -103,6 +139,8 @@ LogApp.createBookmarkStore = (logData, bus) => {
   const canPersist = Boolean(LogApp.isLoggedIn && datasetId && bootId);
   let lastLoginNotice = 0;
   let bookmarks = {};
+  // Bookmarks on rows that have not been paged in yet.
+  let pending = {};
 
   const notify = () => {
     if (bus) bus.emit("bookmarks:changed", getAllWithColors());
@@ -118,10 +156,15 @@ LogApp.createBookmarkStore = (logData, bus) => {
       const payload = await response.json();
       const incoming = payload?.bookmarks || {};
       bookmarks = {};
+      pending = {};
       Object.entries(incoming).forEach(([key, value]) => {
-        if (!validIds.has(String(key))) return;
         const index = Math.max(0, Math.min(5, Number(value) || 0));
-        if (index > 0) bookmarks[String(key)] = index;
+        if (index <= 0) return;
+        if (validIds.has(String(key))) {
+          bookmarks[String(key)] = index;
+        } else if (logData?.next_after != null) {
+          pending[String(key)] = index;
+        }
       });
       notify();
     } catch (err) {
@@ -130,6 +173,22 @@ LogApp.createBookmarkStore = (logData, bus) => {
   };
   load();
 
+  if (bus) {
+    bus.on("events:appended", (page) => {
+      let changed = false;
+      (page || []).forEach((event) => {
+        const key = String(event.row_id);
+        validIds.add(key);
+        if (pending[key]) {
+          bookmarks[key] = pending[key];
+          delete pending[key];
+          changed = true;
+        }
+      });
+      if (changed) notify();
+    });
+  }
+
   const notifyLoginRequired = () => {
     const now = Date.now();
     if (now - lastLoginNotice < 2000) return;
@@ -316,4 +375,5 @@ window.addEventListener("DOMContentLoaded", () => {
   LogApp.initChart(logData, bus);
   LogApp.initSearchPane(logData, bus);
   LogApp.initRightPane(bus);
+  LogApp.loadRemainingEvents(logData, bus, LogApp.searchWorker);
 });
@@ -1,5 +1,31 @@
 window.LogApp = window.LogApp || {};
 
+// Rebuilds event objects from a columnar events API payload (format=columnar).
+// Self-contained: the search worker is built from this function's source.
+LogApp.decodeColumnarEvents = (columnar) => {
+  const count = columnar?.count || 0;
+  const strings = columnar?.strings || [];
+  const columns = columnar?.columns || {};
+  const encodings = columnar?.encodings || {};
+  const events = new Array(count);
+  for (let i = 0; i < count; i += 1) events[i] = {};
+  Object.keys(columns).forEach((field) => {
+    const values = columns[field];
+    const encoding = encodings[field];
+    for (let i = 0; i < count; i += 1) {
+      const value = values[i];
+      if (value == null || encoding === "value") {
+        events[i][field] = value;
+      } else if (encoding === "string") {
+        events[i][field] = strings[value];
+      } else {
+        events[i][field] = value.map((index) => strings[index]);
+      }
+    }
+  });
+  return events;
+};
+
 LogApp.renderLogRow = (
   event,
   templateEl = document.getElementById("log-row-template"),
@@ -88,6 +114,7 @@ LogApp.initLogList = (logData, bus) => {
     events,
     filtered: events,
     filterQuery: "",
+    filterTerms: [],
     rowStride,
     overscan: 4,
     maxVisible: 120,
@@ -138,6 +165,7 @@ LogApp.initLogList = (logData, bus) => {
   let pendingFilter = 0;
   const applyFilterQueries = (queries) => {
     const terms = queries.map((q) => q.trim()).filter(Boolean);
+    state.filterTerms = terms;
     state.filterQuery = terms.join(" | ");
     if (!terms.length) {
       state.filtered = state.events;
@@ -283,6 +311,22 @@ LogApp.initLogList = (logData, bus) => {
         row.classList.toggle("log-selected", row.dataset.rowId === String(state.selectedRowId));
       });
     });
+    // Unfiltered views grow page by page; filtered views and the chart refresh once paging completes.
+    bus.on("events:appended", (page) => {
+      if (state.filtered !== state.events || !page?.length) return;
+      const offset = state.events.length - page.length;
+      page.forEach((event, idx) => state.indexByRowId.set(String(event.row_id), offset + idx));
+      setSpacer();
+      state.lastRange = [0, 0];
+      updateVirtual();
+    });
+    bus.on("events:complete", () => {
+      if (state.filterTerms.length) {
+        applyFilterQueries(state.filterTerms);
+      } else {
+        bus.emit("log:filtered", state.filtered);
+      }
+    });
     bus.on("bookmarks:changed", (map) => {
       const rows = logList.querySelectorAll(".log-line");
       rows.forEach((row) => {
@@ -512,7 +512,7 @@ LogApp.buildSearchParser = () => {
     }
 
       if (lbp < minBp) break;
-    if (op === "OR" || op === "AND") ts.next();
+    if (next.type === "OR" || next.type === "AND") ts.next();
 
       const right = parseExpression(ts, lbp + 1);
       if (op === "AND") {
@@ -637,7 +637,8 @@ LogApp.searchParser = LogApp.buildSearchParser();
 LogApp.createSearchWorker = (events = []) => {
   if (typeof Worker === "undefined") return null;
   const parserSource = LogApp.buildSearchParser.toString();
-  const workerMain = (builderSource) => {
+  const decoderSource = LogApp.decodeColumnarEvents.toString();
+  const workerMain = (builderSource, decodeColumnarEvents) => {
     let EVENTS = [];
     const buildParser = eval("(" + builderSource + ")");
     const parser = buildParser();
@@ -649,6 +650,13 @@ LogApp.createSearchWorker = (events = []) => {
         postMessage({ type: "ready" });
         return;
       }
+      if (payload.type === "append") {
+        const incoming = payload.columnar
+          ? decodeColumnarEvents(payload.columnar)
+          : Array.isArray(payload.events) ? payload.events : [];
+        for (const item of incoming) EVENTS.push(item);
+        return;
+      }
       if (payload.type === "query") {
         const query = payload.query || "";
         if (!query) {
@@ -665,7 +673,8 @@ LogApp.createSearchWorker = (events = []) => {
       }
     };
   };
-  const workerCode = "(" + workerMain.toString() + ")(" + parserSource + ");";
+  const workerCode =
+    "(" + workerMain.toString() + ")(" + parserSource + ", " + decoderSource + ");";
 
   const blob = new Blob([workerCode], { type: "application/javascript" });
   const worker = new Worker(URL.createObjectURL(blob));
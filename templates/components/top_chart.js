@@ -12,15 +12,22 @@ LogApp.initChart = (logData, bus) => {
   const startTime = new Date(logData.start);
   const endTime = new Date(logData.end);
   const spanMs = Math.max(1, endTime - startTime);
-  const bucketMs = 5 * 60 * 1000;
-  const bucketCount = Math.max(1, Math.ceil(spanMs / bucketMs));
-  const bucketSize = bucketMs;
+  // Until the server histogram arrives, bucket the inlined events in 5 minute steps.
+  let bucketStart = startTime.getTime();
+  let bucketSize = 5 * 60 * 1000;
+  let bucketCount = Math.max(1, Math.ceil(spanMs / bucketSize));
+  let serverBuckets = null;
+  let currentEvents = events;
 
-  const labels = [];
-  for (let i = 0; i < bucketCount; i += 1) {
-    const t = new Date(startTime.getTime() + i * bucketSize);
-    labels.push(t.toISOString().slice(11, 16));
-  }
+  const buildLabels = () => {
+    const labels = [];
+    const labelLength = bucketSize < 60 * 1000 ? 19 : 16;
+    for (let i = 0; i < bucketCount; i += 1) {
+      const t = new Date(bucketStart + i * bucketSize);
+      labels.push(t.toISOString().slice(11, labelLength));
+    }
+    return labels;
+  };
 
   const buildBuckets = (sourceEvents) => {
     const buckets = {
@@ -33,7 +40,7 @@ LogApp.initChart = (logData, bus) => {
       const timestamp = new Date(event.utctime);
       const index = Math.min(
         bucketCount - 1,
-        Math.max(0, Math.floor((timestamp - startTime) / bucketSize))
+        Math.max(0, Math.floor((timestamp - bucketStart) / bucketSize))
       );
       if (buckets[event.color]) {
         buckets[event.color][index] += 1;
@@ -161,7 +168,7 @@ LogApp.initChart = (logData, bus) => {
   const stackedChart = new Chart(stackedContext, {
     type: "bar",
     data: {
-      labels,
+      labels: buildLabels(),
       datasets: [
         {
           label: "Green",
@@ -293,7 +300,11 @@ LogApp.initChart = (logData, bus) => {
   }
 
   const updateFilteredEvents = (filteredEvents) => {
-    const buckets = buildBuckets(filteredEvents);
+    currentEvents = filteredEvents;
+    // The unfiltered view is drawn from the server rollups, which cover the
+    // whole boot even while its events are still paging in.
+    const buckets =
+      serverBuckets && filteredEvents === events ? serverBuckets : buildBuckets(filteredEvents);
     stackedChart.data.datasets[0].data = buckets.Green;
     stackedChart.data.datasets[1].data = buckets.Yellow;
     stackedChart.data.datasets[2].data = buckets.Red;
@@ -301,6 +312,27 @@ LogApp.initChart = (logData, bus) => {
     stackedChart.update();
   };
 
+  if (logData.histogram_url) {
+    // At most this many bars; the server picks the rollup width to fit.
+    const maxBars = 120;
+    fetch(`${logData.histogram_url}?dimension=color&buckets=${maxBars}`)
+      .then((response) => (response.ok ? response.json() : null))
+      .then((histogram) => {
+        if (!histogram || !histogram.buckets) return;
+        bucketStart = histogram.start_ms;
+        bucketSize = histogram.resolution_ms;
+        bucketCount = histogram.buckets;
+        const empty = new Array(bucketCount).fill(0);
+        serverBuckets = {};
+        ["Green", "Yellow", "Red", "Flashing Red"].forEach((color) => {
+          serverBuckets[color] = histogram.series[color] || empty;
+        });
+        stackedChart.data.labels = buildLabels();
+        updateFilteredEvents(currentEvents);
+      })
+      .catch(() => {});
+  }
+
   if (bus) {
     bus.on("log:filtered", (filtered) => {
       updateFilteredEvents(filtered || []);